@@ -1,13 +1,272 @@
 """
 遗传算法用于解决浮点数问题
-
+1. 实数编码：种群保存为(population_size, x_num)的ndarray，目标函数为批量版本（如ObjectiveFunctions.sphere_function_batch），
+   一次评估整代种群
+2. 锦标赛选择、模拟二进制交叉（SBX）、多项式变异，均对整代种群一次完成，交叉与变异的结果始终位于[minx, maxx]内
+3. 精英保留：每一代最优的elite_num个父代直接替换子代中最差的个体
+4. 可选批量约束条件，不满足约束的个体在选择中总是劣于满足约束的个体
+5. 可选代理模型（surrogate）：目标函数代价高时，每代生成多倍的子代，由在线训练的代理模型预筛选后只评估预测最好的一部分，
+   max_evaluations限制真实评估次数
 """
 
 
 import random
+import time
 from functools import partial
 import numpy as np
 from typing import Union, List, Callable
 from math import floor, ceil
 from samples import ObjectiveFunctions, Constraints
+from checkpoint import Checkpointable
+
+
+class SMAforfloat(Checkpointable):
+    def __init__(self, objective_function, x_num, minx, maxx, constraint=None, opt_type='min', population_size=100,
+                 max_iter=500, crossover_rate=0.9, eta_c=15, mutation_rate=None, eta_m=20, elite_num=2,
+                 tournament_size=2, seed=None, verbose=False, telemetry=None, checkpoint_path=None,
+                 checkpoint_interval=10, surrogate=None, surrogate_candidates=4, max_evaluations=None):
+        """
+        objective_function: 批量目标函数，输入(n, x_num)的ndarray，返回(n,)的函数值
+        x_num: 变量个数
+        minx: 变量最小值，可以是数或长度为x_num的列表
+        maxx: 变量最大值，可以是数或长度为x_num的列表
+        constraint: 批量约束条件，输入(n, x_num)的ndarray，返回(n,)的布尔值，默认为None即只有框约束
+        opt_type: 'max', 'min'
+        population_size: 种群的大小
+        max_iter: 迭代轮数
+        crossover_rate: 每对父代进行交叉的概率
+        eta_c: SBX的分布指数，越大子代越接近父代
+        mutation_rate: 每个变量发生变异的概率，默认为1 / x_num
+        eta_m: 多项式变异的分布指数，越大变异幅度越小
+        elite_num: 每一代直接保留的最优个体数
+        tournament_size: 锦标赛选择每次参赛的个体数
+        seed: 随机数种子
+        verbose: 是否打印每一代的最优解，默认不打印
+        telemetry: Telemetry实例，每一代记录一次评估次数、最优值、耗时等指标，默认为None即不记录
+        checkpoint_path: 断点文件路径，默认为None即不保存断点，通过SMAforfloat.resume(path)继续搜索
+        checkpoint_interval: 每隔多少代保存一次断点
+        surrogate: 代理模型，如surrogate.RBFSurrogate的实例，用满足约束的个体的真实函数值在线训练；评估点足够多后每代生成
+                   surrogate_candidates倍的子代，只有代理模型预测最好的population_size个交给目标函数评估，默认为None即不使用
+        surrogate_candidates: 使用代理模型时生成的子代数量相对于population_size的倍数
+        max_evaluations: 真实评估次数（stats['evaluations']）的预算，用完后提前结束迭代，默认为None即不限制
+        """
+        if opt_type not in ['max', 'min']:
+            raise ValueError(f"请输入正确的opt_type")
+
+        if not isinstance(population_size, int) or population_size < 2:
+            raise ValueError(f"请输入正确的population_size")
+
+        if not isinstance(surrogate_candidates, int) or surrogate_candidates < 1:
+            raise ValueError(f"请输入正确的surrogate_candidates")
+
+        if not isinstance(elite_num, int) or not 0 <= elite_num < population_size:
+            raise ValueError(f"请输入正确的elite_num")
+
+        self.lower = np.broadcast_to(np.asarray(minx, dtype=float), (x_num,)).copy()
+        self.upper = np.broadcast_to(np.asarray(maxx, dtype=float), (x_num,)).copy()
+        if np.any(self.lower >= self.upper):
+            raise ValueError(f"变量最小值需小于最大值，请检查minx、maxx")
+
+        self.objective_function = objective_function
+        self.constraint = constraint
+        self.x_num = x_num
+        self.opt_type = opt_type
+        self.population_size = population_size
+        self.max_iter = max_iter
+        self.crossover_rate = crossover_rate
+        self.eta_c = eta_c
+        self.mutation_rate = 1 / x_num if mutation_rate is None else mutation_rate
+        self.eta_m = eta_m
+        self.elite_num = elite_num
+        self.tournament_size = tournament_size
+        self.verbose = verbose
+        self.telemetry = telemetry
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.surrogate = surrogate
+        self.surrogate_candidates = surrogate_candidates
+        self.max_evaluations = max_evaluations
+        self.stats = {'evaluations': 0, 'constraint_calls': 0, 'surrogate_avoided': 0}
+
+        self.initial_population = self.initial_sol()
+        self.current_population = self.initial_population.copy()
+        # 搜索状态保存在实例上，便于从断点继续
+        self.current_fitness = self.evaluate(self.current_population)
+        best = int(np.argmin(self.current_fitness))
+        self.best_fitness = float(self.current_fitness[best])
+        self.best_solution = self.current_population[best].copy()
+        self.fitness_history = []  # 每一代种群的最优函数值
+        self.iter = 0
+
+    def initial_sol(self) -> np.ndarray:
+        """
+        初始化种群函数，在[minx, maxx]内均匀抽取population_size个解
+        """
+        return self.lower + self.np_rng.random((self.population_size, self.x_num)) * (self.upper - self.lower)
+
+    def evaluate(self, population) -> np.ndarray:
+        """
+        计算种群中每个个体的函数值，统一转换为最小化；不满足约束的个体函数值为inf
+        """
+        self.stats['evaluations'] += len(population)
+        fitness = np.asarray(self.objective_function(population), dtype=float)
+        if self.opt_type == 'max':
+            fitness = -fitness
+        if self.constraint is not None:
+            self.stats['constraint_calls'] += len(population)
+            fitness = np.where(np.asarray(self.constraint(population), dtype=bool), fitness, np.inf)
+        if self.surrogate is not None:
+            self.surrogate.add(population, fitness)  # 不满足约束的个体函数值为inf，不参与训练
+        return fitness
+
+    def select(self, n) -> np.ndarray:
+        """
+        锦标赛选择，选出n个父代的下标
+        """
+        candidates = self.np_rng.integers(0, self.population_size, size=(n, self.tournament_size))
+        winner = np.argmin(self.current_fitness[candidates], axis=1)
+        return candidates[np.arange(n), winner]
+
+    def crossover(self, parent1, parent2):
+        """
+        模拟二进制交叉（SBX），考虑变量边界，子代始终位于[minx, maxx]内
+        :return: 两组子代
+        """
+        n = len(parent1)
+        lower, upper = self.lower, self.upper
+        y1, y2 = np.minimum(parent1, parent2), np.maximum(parent1, parent2)
+        span = y2 - y1
+        # 每对父代以crossover_rate的概率交叉，交叉时每个变量以0.5的概率参与
+        active = (self.np_rng.random((n, 1)) < self.crossover_rate) & (self.np_rng.random((n, self.x_num)) < 0.5) \
+                 & (span > 1e-14)
+        safe_span = np.where(active, span, 1.0)
+        u = self.np_rng.random((n, self.x_num))
+        power = 1 / (self.eta_c + 1)
+
+        def spread(beta):
+            alpha = 2 - beta ** -(self.eta_c + 1)
+            return np.where(u <= 1 / alpha, (u * alpha) ** power, (1 / (2 - u * alpha)) ** power)
+
+        c1 = 0.5 * (y1 + y2 - spread(1 + 2 * (y1 - lower) / safe_span) * span)
+        c2 = 0.5 * (y1 + y2 + spread(1 + 2 * (upper - y2) / safe_span) * span)
+        c1, c2 = np.clip(c1, lower, upper), np.clip(c2, lower, upper)
+
+        # 随机交换两个子代的变量，避免子代1总是取较小值
+        swap = self.np_rng.random((n, self.x_num)) < 0.5
+        c1, c2 = np.where(swap, c2, c1), np.where(swap, c1, c2)
+        return np.where(active, c1, parent1), np.where(active, c2, parent2)
+
+    def mutation(self, x) -> np.ndarray:
+        """
+        多项式变异，每个变量以mutation_rate的概率变异，变异结果位于[minx, maxx]内
+        """
+        lower, upper = self.lower, self.upper
+        span = upper - lower
+        active = self.np_rng.random(x.shape) < self.mutation_rate
+        u = self.np_rng.random(x.shape)
+        power = 1 / (self.eta_m + 1)
+        delta1, delta2 = (x - lower) / span, (upper - x) / span
+
+        left = (2 * u + (1 - 2 * u) * (1 - delta1) ** (self.eta_m + 1)) ** power - 1
+        right = 1 - (2 * (1 - u) + 2 * (u - 0.5) * (1 - delta2) ** (self.eta_m + 1)) ** power
+        deltaq = np.where(u < 0.5, left, right)
+        return np.where(active, np.clip(x + deltaq * span, lower, upper), x)
+
+    def breed(self, n) -> np.ndarray:
+        """
+        锦标赛选择、SBX交叉、多项式变异生成n个子代
+        """
+        half = (n + 1) // 2
+        parents = self.select(2 * half)
+        child1, child2 = self.crossover(self.current_population[parents[:half]],
+                                        self.current_population[parents[half:]])
+        return self.mutation(np.concatenate([child1, child2])[:n])
+
+    def screen_children(self, n) -> np.ndarray:
+        """
+        代理模型预筛选：生成n * surrogate_candidates个子代，只保留代理模型预测函数值最小的n个，定义了约束时不满足约束的子代排在最后
+        """
+        pool = self.breed(n * self.surrogate_candidates)
+        predicted = self.surrogate.predict(pool)
+        if self.constraint is not None:
+            self.stats['constraint_calls'] += len(pool)
+            predicted = np.where(np.asarray(self.constraint(pool), dtype=bool), predicted, np.inf)
+        self.stats['surrogate_avoided'] += len(pool) - n
+        return pool[np.argsort(predicted, kind='stable')[:n]]
+
+    def step(self):
+        """
+        执行一代：锦标赛选择、SBX交叉、多项式变异生成整代子代，再用上一代的精英替换子代中最差的个体
+        :return: 本代种群的最优函数值
+        """
+        phase_start = time.perf_counter()
+
+        if self.surrogate is not None and self.surrogate.ready(self.x_num) and self.surrogate_candidates > 1:
+            children = self.screen_children(self.population_size)
+        else:
+            children = self.breed(self.population_size)
+        fitness = self.evaluate(children)
+
+        if self.elite_num:
+            elite = np.argsort(self.current_fitness, kind='stable')[:self.elite_num]
+            worst = np.argsort(fitness, kind='stable')[-self.elite_num:]
+            children[worst] = self.current_population[elite]
+            fitness[worst] = self.current_fitness[elite]
+
+        self.current_population = children
+        self.current_fitness = fitness
+        self.iter += 1
+
+        best = int(np.argmin(fitness))
+        generation_best = self.output_value(fitness[best])
+        self.fitness_history.append(generation_best)
+        if fitness[best] < self.best_fitness:
+            self.best_fitness = float(fitness[best])
+            self.best_solution = children[best].copy()
+
+        if self.verbose:
+            print(f"迭代轮数：{self.iter}, 本轮迭代最优的目标函数值为：{generation_best}，"
+                  f"历史最优的目标函数值为：{self.output_value(self.best_fitness)}")
+        if self.telemetry is not None:
+            self.telemetry.record(self.__class__.__name__, 'generation', generation=self.iter,
+                                  generation_best=generation_best, best_fitness=self.output_value(self.best_fitness),
+                                  phase_time=time.perf_counter() - phase_start, **self.stats)
+        return generation_best
+
+    def output_value(self, fitness) -> float:
+        """将内部的最小化函数值转换回原目标函数值"""
+        return float(-fitness if self.opt_type == 'max' else fitness)
+
+    def finished(self):
+        """判断迭代是否结束：达到最大迭代轮数，或者真实评估次数用完预算"""
+        if self.max_evaluations is not None and self.stats['evaluations'] >= self.max_evaluations:
+            return True
+        return self.iter >= self.max_iter
+
+    def solve(self):
+        """
+        主函数
+        :return: 最优的目标函数值以及对应的解
+        """
+        while not self.finished():
+            self.step()
+            self.maybe_checkpoint(self.iter)
+
+        self.flush_checkpoints()
+
+        if self.verbose:
+            print(f"迭代结束，最优的目标函数值为：{self.output_value(self.best_fitness)}")
+            print(f"最优的解为：{self.best_solution.tolist()}")
+        return self.output_value(self.best_fitness), self.best_solution
+
 
+if __name__ == '__main__':
+    for name, obj in [('sphere', ObjectiveFunctions.sphere_function_batch),
+                      ('rosenbrock', ObjectiveFunctions.rosenbrock_function_batch),
+                      ('piecewise', ObjectiveFunctions.piecewise_function_batch)]:
+        ga = SMAforfloat(objective_function=obj, x_num=10, minx=-5, maxx=5, population_size=100, max_iter=500, seed=42)
+        best_fitness, best_solution = ga.solve()
+        print(f"{name}：最优的目标函数值为：{best_fitness}，函数评估次数：{ga.stats['evaluations']}")
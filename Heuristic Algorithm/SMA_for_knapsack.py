@@ -4,136 +4,435 @@
 # email: xue_yu_dian@163.com
 # Time：2024/11/20
 import random
+import time
+import inspect
+import numbers
+from collections import OrderedDict
 from functools import partial
 import numpy as np
 from typing import Union, List, Callable
 from math import floor, ceil
 from samples import ObjectiveFunctions, Constraints
+from checkpoint import Checkpointable
+from repair import knapsack_greedy_repair
+from knapsack_dp import knapsack_dp, knapsack_lp_bound
+from concurrent_eval import ConcurrentEvaluator
 
 
-class SMAforknapsack:
+class SMAforknapsack(Checkpointable):
     def __init__(self, objective_function, values, constraint, weights, max_num: List[int],
-                 max_weight, population_size=1000, max_iter=1000, try_num_max=100):
+                 max_weight, population_size=1000, max_iter=1000, try_num_max=100, verbose=False, telemetry=None,
+                 seed=None, checkpoint_path=None, checkpoint_interval=10, vectorized=False, selection='roulette',
+                 tournament_size=2, mutation_rate=1.0, repair=True,
+                 cache_size=None, upper_bound=None, target_gap=None, surrogate=None, surrogate_candidates=4,
+                 max_evaluations=None, concurrency=None, executor=None):
         """
+        种群保存为(population_size, 物品个数)的整数ndarray，选择、交叉、变异对整代种群一次完成
         objective_function: 目标函数
         constraint: 约束条件
         max_num: 列表：存储所有物品的最多数量
         max_weight: 背包的最大重量
         population_size: 种群的大小
         max_iter: 迭代轮数
+        try_num_max: 不使用修复时，子代不满足约束时重新生成的最大次数，超过后用父代代替
+        verbose: 是否打印每一代的最优解，默认不打印
+        telemetry: Telemetry实例，每一代记录一次评估次数、约束调用次数、最优值、耗时等指标，默认为None即不记录
+        seed: 随机数种子
+        checkpoint_path: 断点文件路径，默认为None即不保存断点，通过SMAforknapsack.resume(path)继续搜索
+        checkpoint_interval: 每隔多少代保存一次断点
+        vectorized: 是否启用批量模式，启用后objective_function与constraint需为批量版本
+                    （ObjectiveFunctions.knapsack_objective_batch、Constraints.knapsack_constraint_batch），
+                    一次评估整代种群；否则逐个个体调用
+        selection: 选择方式，可选'roulette'（轮盘赌）、'tournament'（锦标赛）
+        tournament_size: 锦标赛选择每次参赛的个体数
+        mutation_rate: 每个子代发生变异的概率，变异时随机选择一个物品重新抽取数量
+        repair: 是否对不满足约束的个体进行贪心修复（按价值/重量比丢弃再补充物品），代替反复重新抽样；
+                修复后仍不满足自定义约束的子代用父代代替
+        cache_size: 适应度缓存的容量，以个体的字节串为键缓存适应度与可行性，超出容量时淘汰最久未使用的个体；
+                    默认为None即不缓存。目标函数计算代价高、种群收敛后重复个体多时可以显著减少评估次数
+        upper_bound: 目标函数的上界，可以是一个数，或者'lp'（线性松弛上界）、'dp'（动态规划求出的最优值）；
+                     'lp'与'dp'只适用于线性的背包目标函数。定义target_gap而未定义upper_bound时默认使用'lp'
+        target_gap: 提前终止的相对差距，历史最优值与上界的相对差距 (upper_bound - best) / upper_bound 不超过target_gap时
+                    提前结束迭代，默认为None即不提前终止；使用'dp'上界时设为0即找到最优解后立即结束
+        surrogate: 代理模型，如surrogate.RBFSurrogate的实例，用满足约束的个体的真实适应度在线训练；评估点足够多后每代生成
+                   surrogate_candidates倍的子代，只有代理模型预测最好的population_size个交给目标函数评估，默认为None即不使用
+        surrogate_candidates: 使用代理模型时生成的子代数量相对于population_size的倍数
+        max_evaluations: 真实评估次数（stats['evaluations']）的预算，用完后提前结束迭代，默认为None即不限制
+        concurrency: 并发评估时同时进行的目标函数调用数上限，只支持非批量模式（逐个个体调用目标函数）；
+                     定义concurrency或executor，或者objective_function为async def定义的协程函数时，整代子代并发评估，
+                     默认同时进行8个调用，适应度按个体顺序收集，给定seed时搜索轨迹与逐个调用相同
+        executor: 运行普通目标函数的concurrent.futures执行器，默认为线程池；不写入断点文件
         """
+        if selection not in ['roulette', 'tournament']:
+            raise ValueError(f"请输入正确的selection")
+
+        if not isinstance(surrogate_candidates, int) or surrogate_candidates < 1:
+            raise ValueError(f"请输入正确的surrogate_candidates")
+
+        if len(max_num) < 2:
+            raise ValueError(f"单点交叉需要至少两个物品")
+
         self.objective_function = partial(objective_function, values=values)
+        self.evaluator = None
+        if concurrency is not None or executor is not None or inspect.iscoroutinefunction(objective_function):
+            if vectorized:
+                raise ValueError(f"并发评估只支持非批量模式，批量模式下请在批量目标函数内部并发计算")
+            self.evaluator = ConcurrentEvaluator(self.objective_function, concurrency or 8, executor)
         self.constraint = partial(constraint, weights=weights, max_num=max_num, max_weight=max_weight)
-        self.max_num = max_num
+        self.values = np.asarray(values)
+        self.weights = np.asarray(weights)
+        self.max_num = np.asarray(max_num, dtype=int)
         self.max_weight = max_weight
         self.population_size = population_size
         self.max_iter = max_iter
-        self.initial_population = self.initial_sol()
-        self.current_population = self.initial_population
         self.try_num_max = try_num_max
-        self.best_solution = None
-        self.best_objective_function = None
+        self.verbose = verbose
+        self.telemetry = telemetry
+        self.vectorized = vectorized
+        self.selection = selection
+        self.tournament_size = tournament_size
+        self.mutation_rate = mutation_rate
+        self.repair = repair
+        self.cache_size = cache_size
+        self.cache = OrderedDict() if cache_size else None
+        self.target_gap = target_gap
+        if upper_bound is None and target_gap is not None:
+            upper_bound = 'lp'
+        if upper_bound == 'lp':
+            upper_bound = knapsack_lp_bound(values, weights, max_num, max_weight)
+        elif upper_bound == 'dp':
+            upper_bound = knapsack_dp(values, weights, max_num, max_weight)[0]
+        elif upper_bound is not None and not isinstance(upper_bound, numbers.Real):
+            raise ValueError(f"请输入正确的upper_bound")
+        self.upper_bound = upper_bound
+        self.surrogate = surrogate
+        self.surrogate_candidates = surrogate_candidates
+        self.max_evaluations = max_evaluations
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.stats = {'evaluations': 0, 'constraint_calls': 0, 'repaired': 0, 'cache_hits': 0, 'cache_misses': 0,
+                      'surrogate_avoided': 0}
+        self.initial_population = self.initial_sol()
+        self.current_population = self.initial_population.copy()
+        # 搜索状态保存在实例上，便于从断点继续
+        self.current_fitness = self.evaluate(self.current_population)
+        best = int(np.argmax(self.current_fitness))
+        self.best_objective_function = float(self.current_fitness[best])
+        self.best_solution = self.current_population[best].copy()
+        self.iter = 0
 
-    def initial_sol(self) -> List[List[int]]:
+    def initial_sol(self) -> np.ndarray:
         """
         初始化种群函数，初始化population_size个解形成一个解集
+        每次抽取一整块随机解，修复（或直接丢弃）不满足约束的解，直到数量达到population_size
         """
         population = []
-        for _ in range(self.population_size):
-            solution = [np.random.randint(0, self.max_num[i]+1) for i in range(len(self.max_num))]
-            while not self.constraint(solution):
-                solution = [np.random.randint(0, self.max_num[i]+1) for i in range(len(self.max_num))]
-            population.append(solution)
-        return population
+        count = 0
+        while count < self.population_size:
+            block = self.np_rng.integers(0, self.max_num + 1, size=(self.population_size, len(self.max_num)))
+            feasible = self.repair_population(block) if self.repair else self.is_feasible(block)
+            block = block[feasible]
+            population.append(block)
+            count += len(block)
+        return np.concatenate(population)[:self.population_size]
+
+    @staticmethod
+    def genome_keys(population) -> List[bytes]:
+        """个体的缓存键：统一为int64后的字节串"""
+        return [row.tobytes() for row in np.ascontiguousarray(population, dtype=np.int64)]
+
+    def cache_lookup(self, keys) -> np.ndarray:
+        """
+        查询缓存，命中的个体移到最近使用的位置
+        :return: 缓存的适应度，未命中为nan
+        """
+        cached = np.full(len(keys), np.nan)
+        for i, key in enumerate(keys):
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+                cached[i] = value
+        return cached
+
+    def cache_store(self, keys, fitness):
+        """写入缓存，超出容量时淘汰最久未使用的个体"""
+        for key, value in zip(keys, fitness):
+            self.cache[key] = float(value)
+            self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def is_feasible(self, population) -> np.ndarray:
+        """
+        判断种群中每个个体是否满足约束条件，启用缓存时已缓存的个体不再检查
+        :param population: (n, 物品个数)的ndarray
+        :return: (n,)的布尔ndarray
+        """
+        if self.cache is None:
+            return self.check_constraint(population)
+
+        keys = self.genome_keys(population)
+        cached = self.cache_lookup(keys)
+        feasible = cached != -999
+        miss = np.flatnonzero(np.isnan(cached))
+        if len(miss):
+            feasible[miss] = self.check_constraint(population[miss])
+            # 不满足约束的个体适应度已知为-999，可以直接缓存
+            infeasible = miss[~feasible[miss]]
+            self.cache_store([keys[i] for i in infeasible], np.full(len(infeasible), -999.0))
+        return feasible
+
+    def check_constraint(self, population) -> np.ndarray:
+        """
+        调用约束条件检查每个个体，并统计约束条件的调用次数
+        """
+        self.stats['constraint_calls'] += len(population)
+        if self.vectorized:
+            return np.asarray(self.constraint(population), dtype=bool)
+        return np.array([self.constraint(x) for x in population.tolist()], dtype=bool)
+
+    def repair_population(self, population) -> np.ndarray:
+        """
+        对不满足约束的个体进行贪心修复（原地修改），修复后的个体再检查一次约束
+        :return: (n,)的布尔ndarray，每个个体修复后是否满足约束
+        """
+        feasible = self.is_feasible(population)
+        rows = np.flatnonzero(~feasible)
+        if len(rows):
+            population[rows] = knapsack_greedy_repair(population[rows], self.values, self.weights,
+                                                      self.max_num, self.max_weight)
+            feasible[rows] = self.is_feasible(population[rows])
+            self.stats['repaired'] += len(rows)
+        return feasible
+
+    def evaluate(self, population, feasible=None) -> np.ndarray:
+        """
+        计算种群中每个个体的适应度，启用缓存时只计算未命中的个体，同一批中重复的个体只计算一次
+        由于是最大化问题，默认直接将目标函数作为适应度函数，不满足约束的个体适应度为-999
+        :param feasible: 已知的每个个体是否满足约束，默认重新检查
+        """
+        if self.cache is None:
+            return self.compute_fitness(population, feasible)
+
+        keys = self.genome_keys(population)
+        fitness = self.cache_lookup(keys)
+        miss = np.flatnonzero(np.isnan(fitness))
+        self.stats['cache_hits'] += len(population) - len(miss)
+        self.stats['cache_misses'] += len(miss)
+        if len(miss):
+            unique = {}
+            for i in miss:
+                unique.setdefault(keys[i], i)
+            rows = np.fromiter(unique.values(), dtype=int, count=len(unique))
+            values = self.compute_fitness(population[rows], None if feasible is None else feasible[rows])
+            self.cache_store(unique.keys(), values)
+            lookup = dict(zip(unique.keys(), values))
+            fitness[miss] = [lookup[keys[i]] for i in miss]
+        return fitness
+
+    def compute_fitness(self, population, feasible=None) -> np.ndarray:
+        """
+        调用目标函数计算适应度，不满足约束的个体适应度为-999
+        """
+        if feasible is None:
+            feasible = self.check_constraint(population)
+        fitness = np.full(len(population), -999.0)
+        self.stats['evaluations'] += int(feasible.sum())
+        if self.vectorized:
+            fitness[feasible] = np.asarray(self.objective_function(population[feasible]), dtype=float)
+        elif self.evaluator is not None:
+            fitness[feasible] = self.evaluator.map(population[feasible].tolist())
+        else:
+            fitness[feasible] = [self.objective_function(x) for x in population[feasible].tolist()]
+        if self.surrogate is not None:
+            self.surrogate.add(population[feasible], fitness[feasible])
+        return fitness
 
     def fitness(self, x) -> float:
         """
-        适应度函数
-        由于是最大化问题，默认直接将目标函数作为适应度函数
+        单个个体的适应度函数
         """
-        if not self.constraint(x):
-            return -999
-        return self.objective_function(x)
-    @staticmethod
-    def crossover(parent1, parent2) -> List[int]:
+        return float(self.evaluate(np.asarray(x, dtype=int).reshape(1, -1))[0])
+
+    def select(self, n) -> np.ndarray:
         """
-        交叉操作
+        选择操作，从当前种群中为n个子代各选出两个父代
+        :return: 父代在种群中的下标，(n, 2)的ndarray
         """
-        crossover_point = random.randint(1, len(parent1)-1)
-        child = parent1[:crossover_point] + parent2[crossover_point:]
-        return child
+        fitness = self.current_fitness
+        if self.selection == 'tournament':
+            candidates = self.np_rng.integers(0, len(fitness), size=(n, 2, self.tournament_size))
+            winner = np.argmax(fitness[candidates], axis=-1)
+            return np.take_along_axis(candidates, winner[..., None], axis=-1)[..., 0]
+
+        # 轮盘赌选择，选择概率与适应度成正比
+        weights = np.maximum(fitness, 0)
+        total = weights.sum()
+        p = weights / total if total > 0 else None
+        return self.np_rng.choice(len(fitness), size=(n, 2), p=p)
 
-    def mutation(self, x) -> List[int]:
+    def crossover(self, parent1, parent2) -> np.ndarray:
         """
-        变异操作
+        交叉操作，每对父代随机选择一个交叉点进行单点交叉
         """
-        mutation_point = random.randint(0, len(x)-1)
-        x[mutation_point] = random.randint(0, self.max_num[mutation_point]+1)
-        while not self.constraint(x):
-            x[mutation_point] = random.randint(0, self.max_num[mutation_point]+1)
-            x = self.mutation(x)
+        n, d = parent1.shape
+        crossover_point = self.np_rng.integers(1, d, size=(n, 1))
+        return np.where(np.arange(d) < crossover_point, parent1, parent2)
 
+    def mutation(self, x) -> np.ndarray:
+        """
+        变异操作，以mutation_rate的概率随机选择一个物品，将其数量重新抽取为0到max_num之间的整数（原地修改）
+        """
+        rows = np.flatnonzero(self.np_rng.random(len(x)) < self.mutation_rate)
+        mutation_point = self.np_rng.integers(0, x.shape[1], size=len(rows))
+        x[rows, mutation_point] = self.np_rng.integers(0, self.max_num[mutation_point] + 1)
         return x
 
+    def breed(self, n) -> np.ndarray:
+        """
+        选择、交叉、变异生成n个子代
+        """
+        parents = self.select(n)
+        population = self.current_population
+        children = self.crossover(population[parents[:, 0]], population[parents[:, 1]])
+        return self.mutation(children)
+
+    def screen_children(self, n):
+        """
+        代理模型预筛选：生成n * surrogate_candidates个子代，修复或检查约束后，只保留代理模型预测适应度最高的n个，
+        不满足约束的子代排在最后
+        :return: 子代(n, 物品个数)的ndarray，以及每个子代是否满足约束
+        """
+        pool = self.breed(n * self.surrogate_candidates)
+        feasible = self.repair_population(pool) if self.repair else self.is_feasible(pool)
+        predicted = np.full(len(pool), -np.inf)
+        if feasible.any():
+            predicted[feasible] = self.surrogate.predict(pool[feasible])
+        chosen = np.argsort(-predicted, kind='stable')[:n]
+        self.stats['surrogate_avoided'] += int(feasible.sum() - feasible[chosen].sum())
+        return pool[chosen], feasible[chosen]
+
+    def step(self):
+        """
+        执行一代：选择、交叉、变异生成整代子代，修复或重新生成不满足约束的子代，然后更新历史最优解
+        :return: 本代种群的最优目标函数值
+        """
+        phase_start = time.perf_counter()
+
+        if self.surrogate is not None and self.surrogate.ready(len(self.max_num)) and self.surrogate_candidates > 1:
+            update_population, feasible = self.screen_children(self.population_size)
+            fitness_list = self.evaluate(update_population, feasible)
+        elif self.repair:
+            update_population = self.breed(self.population_size)
+            fitness_list = self.evaluate(update_population, self.repair_population(update_population))
+        else:
+            update_population = self.breed(self.population_size)
+            fitness_list = self.evaluate(update_population)
+
+        # 不使用修复时，不满足约束的子代重新生成，超过try_num_max次后用选出的父代代替
+        pending = np.flatnonzero(fitness_list == -999)
+        try_num = 0
+        while len(pending) and not self.repair and try_num < self.try_num_max:
+            children = self.breed(len(pending))
+            fitness = self.evaluate(children)
+            update_population[pending] = children
+            fitness_list[pending] = fitness
+            pending = pending[fitness == -999]
+            try_num += 1
+        if len(pending):
+            parents = self.select(len(pending))[:, 0]
+            update_population[pending] = self.current_population[parents]
+            fitness_list[pending] = self.current_fitness[parents]
 
+        self.current_population = update_population
+        self.current_fitness = fitness_list
+        self.iter += 1
 
+        best = int(np.argmax(fitness_list))
+        if self.verbose:
+            print(f"迭代轮数：{self.iter}, 本轮迭代最优的目标函数值为：{fitness_list[best]}")
+            print(f"本轮迭代最优的解为：{update_population[best].tolist()}")
+            print('===================================')
+
+        if fitness_list[best] > self.best_objective_function:
+            self.best_objective_function = float(fitness_list[best])
+            self.best_solution = update_population[best].copy()
+            if self.verbose:
+                print('-----------------------------------------------------------------------')
+                print(f"最优解更新：当前最优的目标函数值为：{self.best_objective_function}，最优解为{self.best_solution.tolist()}")
+
+        if self.telemetry is not None:
+            self.telemetry.record(self.__class__.__name__, 'generation', generation=self.iter,
+                                  generation_best=fitness_list[best], best_fitness=self.best_objective_function,
+                                  phase_time=time.perf_counter() - phase_start, **self.stats)
+        return float(fitness_list[best])
+
+    def gap(self):
+        """历史最优值与上界的相对差距，未定义上界时返回None"""
+        if self.upper_bound is None:
+            return None
+        return (self.upper_bound - self.best_objective_function) / max(abs(self.upper_bound), 1e-12)
+
+    def finished(self):
+        """判断迭代是否结束：达到最大迭代轮数，与上界的相对差距不超过target_gap，或者真实评估次数用完预算"""
+        if self.max_evaluations is not None and self.stats['evaluations'] >= self.max_evaluations:
+            return True
+        if self.target_gap is not None and self.gap() <= self.target_gap:
+            return True
+        return self.iter >= self.max_iter
+
+    def emigrants(self, k):
+        """
+        取出当前种群中最优的k个个体（副本），用于岛屿之间的迁移
+        :return: 个体(k, 物品个数)的ndarray以及对应的适应度
+        """
+        top = np.argsort(self.current_fitness, kind='stable')[-k:]
+        return self.current_population[top].copy(), self.current_fitness[top].copy()
 
+    def inject(self, population, fitness):
+        """
+        将外部的个体（如其他岛屿迁移来的个体）注入当前种群，替换其中最差的个体
+        """
+        worst = np.argsort(self.current_fitness, kind='stable')[:len(population)]
+        self.current_population[worst] = population
+        self.current_fitness[worst] = fitness
+        best = int(np.argmax(fitness))
+        if fitness[best] > self.best_objective_function:
+            self.best_objective_function = float(fitness[best])
+            self.best_solution = np.array(population[best], copy=True)
 
     def solve(self):
         """
         主函数
+        :return: 最优的目标函数值以及对应的解
         """
-        current_population = self.current_population
-
-        fitness_list = [self.fitness(x) for x in current_population]
-        self.best_objective_function = max(fitness_list)
-        self.best_solution = current_population[fitness_list.index(max(fitness_list))]
-
-        iter = 0
-        while iter < self.max_iter:
-
-            update_population = []
-            while len(update_population) < len(current_population):
-
-                try_num = 0  # 判断新增的解是否符合约束条件
-                while try_num <= self.try_num_max:
-                    parents = random.choices(current_population, weights=fitness_list, k=2)
-                    child = self.crossover(parents[0], parents[1])
-                    child = self.mutation(child)
-                    if self.constraint(child):
-                        update_population.append(child)
-                        break
-                    else:
-                        try_num += 1
-                if try_num > self.try_num_max:
-                    parents = random.choices(current_population, weights=fitness_list, k=2)
-                    update_population.append(parents[0])
-
-            fitness_list = [self.fitness(x) for x in current_population]
-            current_population = update_population
-            iter += 1
-            print(f"迭代轮数：{iter}, 本轮迭代最优的目标函数值为：{max(fitness_list)}")
-            print(f"本轮迭代最优的解为：{current_population[fitness_list.index(max(fitness_list))]}")
-            print('===================================')
-
-            if max(fitness_list) > self.best_objective_function:
-                self.best_objective_function = max(fitness_list)
-                self.best_solution = current_population[fitness_list.index(max(fitness_list))]
-                print('-----------------------------------------------------------------------')
-                print(f"最优解更新：当前最优的目标函数值为：{self.best_objective_function}，最优解为{self.best_solution}")
+        try:
+            while not self.finished():
+                self.step()
+                self.maybe_checkpoint(self.iter)
+        finally:
+            # 关闭并发评估按需创建的线程池，再次求解时重新创建
+            if self.evaluator is not None:
+                self.evaluator.close()
 
-        print(f"迭代结束，最优的目标函数值为：{self.best_objective_function}")
-        print(f"最优的解为：{self.best_solution}")
-        return
+        self.flush_checkpoints()
 
+        if self.verbose:
+            print(f"迭代结束，最优的目标函数值为：{self.best_objective_function}")
+            print(f"最优的解为：{self.best_solution.tolist()}")
+        return self.best_objective_function, self.best_solution
 
 if __name__ == '__main__':
 
-    knapsack_objective = ObjectiveFunctions.knapsack_objective
-    constraint = Constraints.knapsack_constraint
+    knapsack_objective = ObjectiveFunctions.knapsack_objective_batch
+    constraint = Constraints.knapsack_constraint_batch
     values = [2, 6, 5, 7, 8, 9, 4, 6, 8, 11, 7, 10, 5, 4, 5, 8]
     weights = [3, 4, 2, 5, 6, 7, 4, 5, 6, 9, 7, 8, 5, 4, 5, 6]
     max_num = [5, 3, 7, 8, 7, 7, 5, 4, 7, 3, 7, 6, 7, 8, 7, 8]
     max_weight = 400
-    sma = SMAforknapsack(objective_function=knapsack_objective, values=values, constraint=constraint, weights=weights, max_num=max_num, max_weight=max_weight)
-    sma.solve()
\ No newline at end of file
+    sma = SMAforknapsack(objective_function=knapsack_objective, values=values, constraint=constraint, weights=weights,
+                         max_num=max_num, max_weight=max_weight, vectorized=True, verbose=True)
+    sma.solve()
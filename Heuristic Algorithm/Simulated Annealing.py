@@ -10,14 +10,38 @@
 2、自带多种接受新解的概率，支持自定义接受新解的概率函数
 3. 支持自定义约束函数
 4. 支持自定义变量扰动方案
+5. 支持批量（向量化）模式：候选解集以(n_candidates, x_num)的ndarray保存，目标函数与约束一次评估整个候选解集
+6. 缓存当前候选解集的函数值，支持增量目标函数delta_objective，对可分离目标每次扰动只需O(1)的计算量
+7. 并行回火（ParallelTempering）：多个温度阶梯上的副本以批量数组同步推进，相邻副本按交换准则交换
+8. 约束感知的邻域解生成：支持修复/投影算子（截断、反射、L1球投影）以及在可行区间内直接抽样，代替拒绝抽样
+9. 可选冷却方案（几何、Lundy-Mees、按接受率自适应），支持停滞时回温以及停滞时提前终止
+10. 运行记录：默认不打印也不记录，传入Telemetry后按温度层级记录评估次数、接受率、历史最优值、耗时等指标
+11. 断点保存与恢复：每隔checkpoint_interval个温度层级异步保存完整状态，通过SimulatedAnnealing.resume(path)逐位一致地继续搜索
+12. 排列编码（permutation=True）：用于TSP等访问顺序问题，邻域为交换、插入、2-opt、Or-opt移动，根据距离矩阵O(1)增量计算回路长度
+13. 代理模型辅助（surrogate）：目标函数代价高时，每个候选解生成多个邻域解，由在线训练的代理模型预筛选，只评估预测最好的一个，
+    max_evaluations限制真实评估次数
+14. 并发评估：目标函数调用外部仿真进程等I/O密集操作时，一批候选解的函数值通过线程池或asyncio并发计算，按原顺序收集
+15. 同步多起点（multi_start=True）：批量模式下(n_starts, x_num)数组的每一行是一条独立的退火链，
+    每次迭代所有链同时生成邻域解，用一组均匀随机数逐行按Metropolis准则接受，单个进程内即可推进上百条链
 """
 
 import random
 import math
+import time
+import inspect
 import numpy as np
+from functools import partial
 from samples import ObjectiveFunctions, Constraints
+from repair import REPAIR_OPERATORS
+from cooling_schedules import CoolingSchedule, COOLING_SCHEDULES
+from checkpoint import Checkpointable
+from permutation import PERMUTATION_MOVES, random_tour
+from concurrent_eval import ConcurrentEvaluator
+
+class SimulatedAnnealing(Checkpointable):
+    # 候选解集的各行是否相互独立（如并行回火中不同温度的副本），独立时找不到可行邻域解的行保持当前值，不借用前一行
+    independent_rows = False
 
-class SimulatedAnnealing:
     def __init__(self, **kwargs):
         """
         :param initial_solution: 初始解，以列表的形式
@@ -30,11 +54,56 @@ class SimulatedAnnealing:
         :param constraint: 约束条件【输入自变量形式，返回True or False】
         :param integer: 变量是否是整数
         :param prob_type: 概率函数【可选‘Metropolis’或者自定义一个函数
+                          自定义函数为prob_type(new_fitness, current_fitness, temperature)，返回接受新解的概率；
+                          并行回火中三个参数均为(n_replicas,)的ndarray，temperature为各副本的温度
         :param temperature: 初始温度
         :param cooling_rate: 冷却系数
         :param num_iterations: 每次退火的迭代次数
         :param coef: 生成邻域解的时候乘的系数【在乘上温度值之后的系数】
         :param check_num: 在搜索邻域解时候允许自变量搜索满足约束解的次数，若是超过次数则舍弃这个解，将之前的一个解进行搜索
+        :param vectorized: 是否启用批量模式，启用后objective_function与constraint需为批量版本
+                           （如ObjectiveFunctions.sphere_function_batch），输入(n_candidates, x_num)的ndarray，
+                           分别返回(n_candidates,)的函数值与布尔值
+        :param seed: 随机数种子
+        :param delta_objective: 增量目标函数 delta_objective(solution, move)，返回执行移动move后函数值的变化量，
+                                move为(idx, new_values)，表示将solution[idx]改为new_values；
+                                批量模式下solution为(n_candidates, x_num)的ndarray，idx与new_values为(n_candidates, perturb_num)的ndarray
+        :param perturb_num: 使用delta_objective时每个候选解每次扰动的变量个数
+        :param verbose: 是否在每个温度层级打印当前最优解，默认不打印
+        :param telemetry: Telemetry实例，用于按温度层级记录运行指标，默认为None即不记录
+        :param repair: 修复/投影算子，扰动结果不满足约束时直接修复而不是重新抽样，
+                       可选'clip'（截断）、'reflect'（反射）、'l1_ball'（投影到L1球）或者自定义函数【输入ndarray，返回修复后的ndarray】
+        :param repair_params: 修复算子的参数字典，'clip'与'reflect'默认使用{'lower': minx, 'upper': maxx}，
+                              'l1_ball'默认使用{'radius': 10}
+        :param feasible_interval: 可行扰动区间函数【输入当前解的ndarray，返回(lo, hi)】，如FeasibleIntervals.box_interval，
+                                  定义后邻域解只在可行区间内抽样
+        :param init_sampler: 初始化候选解集的抽样方式，可选'uniform'（均匀随机）、'lhs'（拉丁超立方）、'sobol'（Sobol序列，需要scipy）
+        :param init_budget: 初始化候选解集时约束调用次数的上限，超出后报告失败
+        :param cooling_schedule: 冷却方案，可选'geometric'（几何冷却，默认）、'lundy_mees'、'adaptive'（按接受率自适应），
+                                 或者传入CoolingSchedule的实例
+        :param cooling_params: 冷却方案的参数字典，'geometric'与'adaptive'的rate默认为cooling_rate
+        :param reheat_patience: 连续多少个温度层级最优解没有改进时回温，默认不回温
+        :param reheat_factor: 回温时温度乘的系数，回温后的温度不超过初始温度
+        :param stagnation_patience: 连续多少个温度层级最优解没有改进时提前终止，默认不提前终止
+        :param checkpoint_path: 断点文件路径，默认为None即不保存断点
+        :param checkpoint_interval: 每隔多少个温度层级保存一次断点
+        :param permutation: 是否使用排列编码，启用后每个候选解是x_num个城市编号的列表，邻域由permutation_moves中的移动算子生成，
+                            函数值由distance_matrix增量计算；objective_function默认为回路长度，constraint可以不定义
+        :param distance_matrix: 排列编码下的距离矩阵，x_num默认为其城市数量
+        :param permutation_moves: 排列编码下使用的移动算子，每次扰动从中随机选择一个，
+                                  可选'swap'、'insert'、'two_opt'、'or_opt'，默认全部使用
+        :param surrogate: 代理模型，如surrogate.RBFSurrogate的实例，只支持批量模式且未定义delta_objective的情况；
+                          每次真实评估的结果都用于在线训练，评估点足够多后每个候选解生成surrogate_candidates个邻域解，
+                          只有代理模型预测最好的一个交给目标函数评估，默认为None即不使用
+        :param surrogate_candidates: 使用代理模型时每个候选解生成的邻域解个数
+        :param max_evaluations: 真实评估次数（stats['evaluations']）的预算，用完后提前终止，默认为None即不限制
+        :param concurrency: 并发评估时同时进行的目标函数调用数上限，只支持非批量模式（逐个候选解调用目标函数），
+                            定义concurrency或executor，或者objective_function为async def定义的协程函数时启用并发评估，
+                            默认同时进行8个调用；函数值按候选解的顺序收集，给定seed时搜索轨迹与逐个调用相同
+        :param executor: 运行普通目标函数的concurrent.futures执行器，默认为线程池；不写入断点文件
+        :param multi_start: 是否同步推进多条独立的退火链，只支持批量模式；启用后候选解集的每一行是一条链，
+                            逐行判断是否接受新解，而不是整个候选解集一起接受或拒绝
+        :param n_starts: 同步多起点的链数，默认为num_iterations
 
         """
 
@@ -57,7 +126,35 @@ class SimulatedAnnealing:
             'best_fitness': None,
             'prob_type': 'Metropolis',
             'coefficient': 0.5,
-            'check_num': 100000
+            'check_num': 100000,
+            'vectorized': False,
+            'seed': None,
+            'delta_objective': None,
+            'perturb_num': 1,
+            'verbose': False,
+            'telemetry': None,
+            'repair': None,
+            'repair_params': None,
+            'feasible_interval': None,
+            'init_sampler': 'uniform',
+            'init_budget': 1000000,
+            'cooling_schedule': 'geometric',
+            'cooling_params': None,
+            'reheat_patience': None,
+            'reheat_factor': 2.0,
+            'stagnation_patience': None,
+            'checkpoint_path': None,
+            'checkpoint_interval': 10,
+            'permutation': False,
+            'distance_matrix': None,
+            'permutation_moves': ('swap', 'insert', 'two_opt', 'or_opt'),
+            'surrogate': None,
+            'surrogate_candidates': 4,
+            'max_evaluations': None,
+            'concurrency': None,
+            'executor': None,
+            'multi_start': False,
+            'n_starts': None
         }
         if 'opt_type' in kwargs and kwargs['opt_type'] not in ['max', 'min']:
             raise ValueError(f"请输入正确的opt_type")
@@ -77,9 +174,44 @@ class SimulatedAnnealing:
         if 'check_num' in kwargs and not isinstance(kwargs['check_num'], (int, float)):
             raise ValueError(f"请输入正确的check_num")
 
-        for key in ['objective_function', 'constraint']:
-             if key not in kwargs or kwargs[key] is None:
-                 raise ValueError(f"参数{key}未定义，请重新输入")
+        if 'init_sampler' in kwargs and kwargs['init_sampler'] not in ['uniform', 'lhs', 'sobol']:
+            raise ValueError(f"请输入正确的init_sampler")
+
+        if 'init_budget' in kwargs and not isinstance(kwargs['init_budget'], int):
+            raise ValueError(f"请输入正确的init_budget")
+
+        if 'checkpoint_interval' in kwargs and (not isinstance(kwargs['checkpoint_interval'], int)
+                                                or kwargs['checkpoint_interval'] < 1):
+            raise ValueError(f"请输入正确的checkpoint_interval")
+
+        if kwargs.get('surrogate') is not None:
+            if not kwargs.get('vectorized') or kwargs.get('delta_objective') is not None:
+                raise ValueError(f"代理模型只支持批量模式且未定义delta_objective的情况")
+            if not isinstance(kwargs.get('surrogate_candidates', 4), int) or kwargs.get('surrogate_candidates', 4) < 1:
+                raise ValueError(f"请输入正确的surrogate_candidates")
+
+        if kwargs.get('multi_start') and not kwargs.get('vectorized'):
+            raise ValueError(f"同步多起点只支持批量模式，请设置vectorized=True")
+
+        if kwargs.get('n_starts') is not None and (not isinstance(kwargs['n_starts'], int) or kwargs['n_starts'] < 1):
+            raise ValueError(f"请输入正确的n_starts")
+
+        if kwargs.get('permutation'):
+            if kwargs.get('distance_matrix') is None:
+                raise ValueError(f"排列编码下需要定义距离矩阵distance_matrix")
+            if kwargs.get('vectorized'):
+                raise ValueError(f"排列编码暂不支持批量模式")
+            if any(move not in PERMUTATION_MOVES for move in kwargs.get('permutation_moves', PERMUTATION_MOVES)):
+                raise ValueError(f"请输入正确的permutation_moves")
+            if kwargs.get('objective_function') is None:
+                kwargs['objective_function'] = partial(ObjectiveFunctions.tour_length,
+                                                       dist_matrix=kwargs['distance_matrix'])
+            kwargs.setdefault('x_num', len(kwargs['distance_matrix']))
+            kwargs.setdefault('integer', 1)
+        else:
+            for key in ['objective_function', 'constraint']:
+                 if key not in kwargs or kwargs[key] is None:
+                     raise ValueError(f"参数{key}未定义，请重新输入")
 
         # 先将默认参数设置到实例上
         for key, value in default_params.items():
@@ -90,76 +222,173 @@ class SimulatedAnnealing:
             for key, value in kwargs.items():
                 setattr(self, key, value)
 
+        self.rng = random.Random(self.seed)
+        self.np_rng = np.random.default_rng(self.seed)
+
+        self.evaluator = None
+        if self.concurrency is not None or self.executor is not None or \
+                inspect.iscoroutinefunction(self.objective_function):
+            if self.vectorized:
+                raise ValueError(f"并发评估只支持非批量模式，批量模式下请在批量目标函数内部并发计算")
+            self.evaluator = ConcurrentEvaluator(self.objective_function, self.concurrency or 8, self.executor)
+
+        # 统计信息：完整评估次数与增量评估次数（均按单个候选解计数），约束调用次数，修复次数，估计节省的约束调用次数，
+        # 以及被代理模型筛掉的真实评估次数
+        self.stats = {'evaluations': 0, 'delta_evaluations': 0, 'constraint_calls': 0, 'repaired': 0,
+                      'constraint_calls_saved': 0, 'surrogate_avoided': 0}
+
+        self.init_report = None  # 初始化候选解集的抽样记录：抽样方式、约束调用次数、可行解个数
+
+        if self.repair is None or callable(self.repair):
+            self.repair_operator = self.repair
+        elif self.repair in REPAIR_OPERATORS:
+            default_repair_params = {'radius': 10} if self.repair == 'l1_ball' else {'lower': self.minx, 'upper': self.maxx}
+            self.repair_operator = partial(REPAIR_OPERATORS[self.repair], **{**default_repair_params, **(self.repair_params or {})})
+        else:
+            raise ValueError(f"请输入正确的repair")
+
+        if isinstance(self.cooling_schedule, CoolingSchedule):
+            self.cooling = self.cooling_schedule
+        elif self.cooling_schedule in COOLING_SCHEDULES:
+            default_cooling_params = {} if self.cooling_schedule == 'lundy_mees' else {'rate': self.cooling_rate}
+            self.cooling = COOLING_SCHEDULES[self.cooling_schedule](**{**default_cooling_params, **(self.cooling_params or {})})
+        else:
+            raise ValueError(f"请输入正确的cooling_schedule")
+
+        self.initial_temperature = self.temperature  # 回温时温度的上限
+        self.acceptance_ratio = None  # 最近一个温度层级的接受率
+        self.stagnation = 0  # 最优解连续没有改进的温度层级数
+
+        if self.repair == 'l1_ball' and self.delta_objective is not None:
+            raise ValueError(f"使用delta_objective时只扰动部分变量，不支持'l1_ball'投影，请改用feasible_interval")
+
+        if self.vectorized and self.x_num is None:
+            raise ValueError(f"批量模式下需要定义变量个数x_num")
+
         if self.initial_solution is None:
             self.initial_solution = self.initial_sol()
 
         # 查看输入的初始变量和给定是否是整数的约束条件是否一致
+        if self.vectorized:
+            self.initial_solution = np.asarray(self.initial_solution).reshape(-1, self.x_num)
+
         if self.integer:
-            if all(isinstance(x, int) for x in np.nditer(np.array(self.initial_solution))):
+            if self.vectorized and np.issubdtype(self.initial_solution.dtype, np.integer):
+                pass
+            elif all(isinstance(x.item(), int) for x in np.nditer(np.array(self.initial_solution))):
                 pass
             else:
                 raise ValueError(f"定义自变量为整数类型，但是初始值内存在浮点数，请重新定义初始值或修改自变量类型")
 
         if kwargs:
-            if 'best_solution' not in kwargs or kwargs['best_solution'] is None:
-                setattr(self, 'best_solution', self.initial_solution)
-
             if 'current_solution' not in kwargs or kwargs['current_solution'] is None:
-                setattr(self, 'current_solution', self.initial_solution)
+                # 接受新解时会原地修改当前解，因此复制一份，避免改动初始解
+                setattr(self, 'current_solution', [self.copy_solution(x) for x in self.initial_solution]
+                        if not self.vectorized else self.initial_solution.copy())
 
-            if kwargs["objective_function"] is not None and ('best_fitness' not in kwargs or kwargs['best_fitness'] is None):
-                setattr(self, 'best_fitness', min([kwargs["objective_function"](i) for i in self.initial_solution]))
+        if self.delta_objective is not None and not self.vectorized and \
+                not all(isinstance(x, list) for x in self.current_solution):
+            raise ValueError(f"使用delta_objective时候选解需为列表形式的多维变量")
 
+        self.count = 0  # 已完成的温度层级数
+        self.fitness_history = []  # 每个温度层级下候选解集的最优函数值
+        # 缓存当前候选解集中每个候选解的函数值，避免每次迭代重复计算
+        self.current_fitness = self.evaluate(self.current_solution)
+
+        best_fitness, best_sol = self.best()
+        if 'best_fitness' not in kwargs or kwargs['best_fitness'] is None:
+            setattr(self, 'best_fitness', best_fitness)
+        if 'best_solution' not in kwargs or kwargs['best_solution'] is None:
+            setattr(self, 'best_solution', self.copy_solution(best_sol))
 
     def initial_sol(self):
         """
         初始化候选解集
         :return: initial_solutions
         """
-        sol_cnt = self.num_iterations
-        check_num = self.check_num # 直接共用一个参数
-        candidate_sol_cnt = sol_cnt * 2
+        if self.permutation:
+            return self.sample_permutations(self.num_iterations)
+        if self.multi_start:
+            return self.sample_initial(self.n_starts or self.num_iterations)
+        return self.sample_initial(self.num_iterations)
+
+    def sample_permutations(self, sol_cnt):
+        """
+        排列编码下随机生成sol_cnt个回路，定义了constraint时只保留满足约束的回路，约束调用总次数不超过init_budget
+        """
+        solutions = []
+        draws = 0
+        while len(solutions) < sol_cnt:
+            if draws >= self.init_budget:
+                raise ValueError(f"初始化失败：约束调用{draws}次只找到{len(solutions)}个满足约束的回路，需要{sol_cnt}个，"
+                                 f"请增大init_budget，或直接传入initial_solution")
+            tour = random_tour(self.x_num, self.rng)
+            draws += 1
+            if self.constraint is None or self.is_feasible(tour):
+                solutions.append(tour)
+        self.init_report = {'sampler': 'permutation', 'draws': draws, 'feasible': len(solutions)}
+        return solutions
+
+    def sample_block(self, n):
+        """
+        按init_sampler一次抽取n个候选解，返回形状为(n, x_num)的ndarray
+        'uniform'为均匀随机抽样，'lhs'为拉丁超立方抽样，'sobol'为Sobol低差异序列（需要安装scipy）
+        """
+        x_num = self.x_num or 1
+        if self.init_sampler == 'uniform':
+            u = self.np_rng.random((n, x_num))
+        elif self.init_sampler == 'lhs':
+            # 每个维度划分为n个等宽区间，每个区间恰好抽取一个点，各维度的区间顺序独立打乱
+            strata = self.np_rng.random((n, x_num)).argsort(axis=0)
+            u = (strata + self.np_rng.random((n, x_num))) / n
+        else:
+            try:
+                from scipy.stats import qmc
+            except ImportError:
+                raise ImportError(f"init_sampler='sobol'需要安装scipy，请安装scipy或改用'uniform'、'lhs'")
+            u = qmc.Sobol(d=x_num, scramble=True, seed=self.np_rng).random(n)
 
-        candidate_sol = []
+        if self.integer:
+            return np.minimum(self.minx + np.floor(u * (self.maxx - self.minx + 1)), self.maxx).astype(int)
+        return self.minx + u * (self.maxx - self.minx)
 
-        try:
-            if self.integer:
-                while len(candidate_sol) <= candidate_sol_cnt:
-                    i = 0
-                    while i <= check_num:
-                        a = random.random(self.minx, self.maxx)
-                        if self.constraint(a):
-                            candidate_sol.append(a)
-                            break
-                return random.sample(candidate_sol, sol_cnt)
-            else:
-                while len(candidate_sol) <= candidate_sol_cnt:
-                    i = 0
-                    while i <= check_num:
-                        a = random.uniform(self.minx, self.maxx)
-                        if self.constraint(a):
-                            candidate_sol.append(a)
-                            break
-                return random.sample(candidate_sol, sol_cnt)
-        except:
-            if self.integer:
-                while len(candidate_sol) <= candidate_sol_cnt:
-                    i = 0
-                    while i <= check_num:
-                        a = [random.random(self.minx, self.maxx) for _ in range(self.x_num)]
-                        if self.constraint(a):
-                            candidate_sol.append(a)
-                            break
-                return random.sample(candidate_sol, sol_cnt)
+    def sample_initial(self, sol_cnt):
+        """
+        分块抽样初始化候选解集：每次抽取一整块候选解，批量模式下用批量约束一次性筛选，直到可行解数量达到sol_cnt。
+        每块的大小根据已观测到的可行率自适应调整，约束调用总次数不超过init_budget，超出则报告失败原因
+        :return: 批量模式下为形状为(sol_cnt, x_num)的ndarray；否则为列表，x_num为1时每个候选解是一个数，否则是一个列表
+        """
+        feasible = []
+        feasible_cnt = 0
+        draws = 0
+        block_size = sol_cnt * 2
+
+        while feasible_cnt < sol_cnt:
+            block_size = min(block_size, self.init_budget - draws)
+            if block_size <= 0:
+                self.init_report = {'sampler': self.init_sampler, 'draws': draws, 'feasible': feasible_cnt}
+                raise ValueError(f"初始化失败：使用'{self.init_sampler}'抽样，约束调用{draws}次（预算init_budget={self.init_budget}）"
+                                 f"只找到{feasible_cnt}个满足约束的解，需要{sol_cnt}个，可行率约为{feasible_cnt / max(draws, 1):.2e}。"
+                                 f"请检查minx、maxx是否覆盖可行域，增大init_budget，或直接传入initial_solution")
+
+            block = self.sample_block(block_size)
+            if self.vectorized:
+                block = block[self.is_feasible(block)]
             else:
-                while len(candidate_sol) <= candidate_sol_cnt:
-                    i = 0
-                    while i <= check_num:
-                        a = [random.uniform(self.minx, self.maxx) for _ in range(self.x_num)]
-                        if self.constraint(a):
-                            candidate_sol.append(a)
-                            break
-                return random.sample(candidate_sol, sol_cnt)
+                block = [x for x in (block[:, 0] if (self.x_num or 1) == 1 else block).tolist() if self.is_feasible(x)]
+            feasible.append(block)
+            feasible_cnt += len(block)
+            draws += block_size
+
+            # 根据当前可行率估计还需要抽取多少个候选解
+            rate = feasible_cnt / draws
+            needed = sol_cnt - feasible_cnt
+            block_size = int(np.ceil(needed / rate * 1.2)) if rate > 0 else block_size * 2
+
+        self.init_report = {'sampler': self.init_sampler, 'draws': draws, 'feasible': feasible_cnt}
+        if self.vectorized:
+            return np.concatenate(feasible)[:sol_cnt]
+        return [x for block in feasible for x in block][:sol_cnt]
 
     def neighbor_solution(self, solution):
         """
@@ -168,24 +397,27 @@ class SimulatedAnnealing:
         对于多维数组（如矩阵形式的变量），对每个子数组或元素根据其维度进行合适的扰动。
         邻域解的大小跟温度正相关，需要根据具体量纲大小乘上对应系数coef
         """
+        if self.vectorized:
+            return self.neighbor_solution_batch(solution)
+
         neighbor = solution.copy()
+        step = self.temperature * self.coefficient
 
         if isinstance(solution, list) and all(isinstance(x, (int, float)) for x in solution):
             # 一维数组情况，多个单变量
             i = 0
             while i < len(solution):
                 flag = 0
+                current = np.array([neighbor[i]])
+                interval = self.feasible_interval(current) if self.feasible_interval is not None else None
 
                 # 更改自变量值之后需要检查是否满足约束
 
                 for j in range(self.check_num):
-                    if self.integer:
-                        new_sol = neighbor[i] + int(random.uniform(-1, 1) * self.temperature * self.coefficient)
-                    else:
-                        new_sol = neighbor[i] + random.uniform(-1, 1) * self.temperature * self.coefficient
+                    new_sol = self.perturb(current, step, interval)[0].item()
 
-                    if self.constraint(new_sol):
-                        neighbor[i] += new_sol
+                    if self.is_feasible(new_sol):
+                        neighbor[i] = new_sol
                         flag = 1
                         break
 
@@ -195,7 +427,7 @@ class SimulatedAnnealing:
                         new_sol = neighbor[i]
                     else:
                         # 如果尝试多次都无法满足约束，那么有一半的概率用前一个值代替，也有一半的概率保持当前值不变
-                        if random.random() < 0.5:
+                        if self.rng.random() < 0.5:
                             new_sol = neighbor[i - 1]
                         else:
                             new_sol = neighbor[i]
@@ -206,20 +438,16 @@ class SimulatedAnnealing:
         elif isinstance(solution, list) and all(isinstance(x, list) for x in solution):
             # 多维数组情况
             i = 0
-            while i <= len(solution):
+            while i < len(solution):
                 flag = 0
-                new_sol = [0]* len(solution[i])
+                current = np.array(neighbor[i])
+                interval = self.feasible_interval(current) if self.feasible_interval is not None else None
 
                 for j in range(self.check_num):
-                    if self.integer:
-                        for j in range(len(solution[i])):
-                            new_sol[j] = neighbor[i][j] + int(random.uniform(-1, 1) * self.temperature * self.coefficient)
-                    else:
-                        for j in range(len(solution[i])):
-                            new_sol[j] = neighbor[i][j] + random.uniform(-1, 1) * self.temperature * self.coefficient
+                    new_sol = self.perturb(current, step, interval).tolist()
 
-                    if self.constraint(new_sol):
-                        neighbor[i] += new_sol
+                    if self.is_feasible(new_sol):
+                        neighbor[i] = new_sol
                         flag = 1
                         break
 
@@ -227,7 +455,7 @@ class SimulatedAnnealing:
                     if i == 0:
                         new_sol = neighbor[i]
                     else:
-                        if random.random() < 0.5:
+                        if self.rng.random() < 0.5:
                             new_sol = neighbor[i - 1]
                         else:
                             new_sol = neighbor[i]
@@ -238,75 +466,536 @@ class SimulatedAnnealing:
             raise ValueError("Unsupported solution type：暂时只支持一维变量")
         return neighbor
 
-    def acceptance_probability(self, new_fitness, current_fitness):
+    def perturb(self, x, step, interval=None):
+        """
+        在x附近按步长step生成扰动值，x为ndarray，最后一维为变量维度
+        若给定可行区间interval=(lo, hi)，则只在[x-step, x+step]与可行区间的交集内均匀抽样；
+        若定义了repair，则对扰动结果做修复/投影，而不是丢弃后重新抽样
+        """
+        low, high = x - step, x + step
+        if interval is not None:
+            lo, hi = interval
+            width = np.where(high > low, high - low, 1)
+            low, high = np.maximum(low, lo), np.minimum(high, hi)
+            # 均匀扰动落在可行区间内的概率为p时，拒绝抽样期望需要1/p次约束调用，以此估计节省的约束调用次数
+            feasible_prob = np.maximum(np.prod(np.clip((high - low) / width, 0, 1), axis=-1), 1 / self.check_num)
+            self.stats['constraint_calls_saved'] += float(np.sum(1 / feasible_prob - 1))
+
+        offset = self.np_rng.uniform(low - x, high - x)
+        if self.integer:
+            offset = np.trunc(offset)
+        trial = x + offset
+
+        if self.repair_operator is not None:
+            repaired = self.repair_operator(trial)
+            # 被修复的扰动结果原本不满足约束，至少节省了一次重新抽样的约束调用
+            changed = int(np.sum(np.any(repaired != trial, axis=-1)))
+            self.stats['repaired'] += changed
+            self.stats['constraint_calls_saved'] += changed
+            trial = np.trunc(repaired) if self.integer else repaired
+
+        return trial.astype(x.dtype) if self.integer else trial
+
+    def is_feasible(self, x):
+        """
+        调用约束条件并统计调用次数，批量模式下x为(n_candidates, x_num)的ndarray，返回布尔ndarray
+        """
+        if self.vectorized:
+            self.stats['constraint_calls'] += len(x)
+            return np.asarray(self.constraint(x), dtype=bool)
+        self.stats['constraint_calls'] += 1
+        return self.constraint(x)
+
+    def neighbor_move(self, solution):
+        """
+        为单个候选解生成一个邻域移动(idx, new_values)，只扰动perturb_num个变量，不复制整个解。
+        检查约束时临时在原解上修改，检查后立即恢复
+        :return: 移动(idx, new_values)，若尝试check_num次都无法满足约束则返回None
+        """
+        if self.permutation:
+            return self.permutation_move(solution)
+
+        step = self.temperature * self.coefficient
+        idx = self.rng.sample(range(len(solution)), self.perturb_num)
+        old_values = [solution[i] for i in idx]
+        current = np.array(old_values)
+        interval = None
+        if self.feasible_interval is not None:
+            lo, hi = self.feasible_interval(np.array(solution))
+            interval = lo[idx], hi[idx]
+
+        for _ in range(self.check_num):
+            new_values = self.perturb(current, step, interval).tolist()
+
+            for i, v in zip(idx, new_values):
+                solution[i] = v
+            feasible = self.is_feasible(solution)
+            for i, v in zip(idx, old_values):
+                solution[i] = v
+
+            if feasible:
+                return idx, new_values
+        return None
+
+    def permutation_move(self, solution):
+        """
+        排列编码下为单个回路生成一个移动(算子名称, 下标)，定义了constraint时在回路副本上检查约束
+        :return: 移动，若尝试check_num次都无法满足约束则返回None
+        """
+        for _ in range(self.check_num):
+            name = self.rng.choice(self.permutation_moves)
+            move = (name, PERMUTATION_MOVES[name].sample(solution, self.rng))
+            if self.constraint is None:
+                return move
+            trial = list(solution)
+            PERMUTATION_MOVES[name].apply(trial, move[1])
+            if self.is_feasible(trial):
+                return move
+        return None
+
+    def move_delta(self, solution, move):
+        """单个候选解执行移动后函数值的变化量"""
+        if self.permutation:
+            name, params = move
+            return PERMUTATION_MOVES[name].delta(solution, self.distance_matrix, params)
+        return self.delta_objective(solution, move)
+
+    def neighbor_moves(self, solution):
+        """
+        为候选解集中的每个候选解生成邻域移动，并用delta_objective增量计算移动后的函数值
+        :return: moves, new_fitness
+        """
+        if self.vectorized:
+            return self.neighbor_moves_batch(solution)
+
+        moves = []
+        new_fitness = list(self.current_fitness)
+        for k, sol in enumerate(solution):
+            move = self.neighbor_move(sol)
+            moves.append(move)
+            if move is not None:
+                new_fitness[k] += self.move_delta(sol, move)
+                self.stats['delta_evaluations'] += 1
+        return moves, new_fitness
+
+    def neighbor_moves_batch(self, solution):
+        """
+        批量模式下为所有候选解同时生成邻域移动，idx与new_values均为(n_candidates, perturb_num)的ndarray。
+        无法满足约束的候选解，其移动保持原值不变（增量为0）
+        """
+        step = self.temperature * self.coefficient
+        n, d = solution.shape
+        if self.perturb_num == 1:
+            idx = self.np_rng.integers(0, d, size=(n, 1))
+        else:
+            idx = self.np_rng.random((n, d)).argpartition(self.perturb_num, axis=1)[:, :self.perturb_num]
+        old_values = np.take_along_axis(solution, idx, axis=1)
+        new_values = old_values.copy()
+        pending = np.arange(n)
+        if self.feasible_interval is not None:
+            lo, hi = self.feasible_interval(solution)
+            lo, hi = np.take_along_axis(lo, idx, axis=1), np.take_along_axis(hi, idx, axis=1)
+
+        for _ in range(self.check_num):
+            interval = (lo[pending], hi[pending]) if self.feasible_interval is not None else None
+            trial = self.perturb(old_values[pending], step, interval)
+
+            # 在待检查候选解的副本上写入新值后检查约束，原解保持不变
+            rows = solution[pending]
+            np.put_along_axis(rows, idx[pending], trial, axis=1)
+            feasible = self.is_feasible(rows)
+
+            new_values[pending[feasible]] = trial[feasible]
+            pending = pending[~feasible]
+            if len(pending) == 0:
+                break
+
+        moves = (idx, new_values)
+        new_fitness = self.current_fitness + self.delta_objective(solution, moves)
+        self.stats['delta_evaluations'] += n
+        return moves, new_fitness
+
+    def apply_moves(self, solution, moves):
+        """
+        接受新解时，直接在原候选解集上执行移动，而不是复制整个解
+        """
+        if self.vectorized:
+            idx, new_values = moves
+            np.put_along_axis(solution, idx, new_values, axis=1)
+            return
+
+        for sol, move in zip(solution, moves):
+            if move is None:
+                continue
+            if self.permutation:
+                name, params = move
+                PERMUTATION_MOVES[name].apply(sol, params)
+                continue
+            for i, v in zip(*move):
+                sol[i] = v
+
+    def neighbor_solution_batch(self, solution, step=None):
+        """
+        批量模式下生成整个候选解集的邻域解：所有候选解同时扰动，用批量约束一次性检查，
+        只对不满足约束的候选解重新抽样，最多重试check_num次
+        :param step: 扰动步长，默认为temperature * coefficient；也可以是(n_candidates,)的ndarray，为每个候选解单独指定
+        """
+        if step is None:
+            step = self.temperature * self.coefficient
+        step = np.broadcast_to(np.asarray(step, dtype=float), (len(solution),))
+        neighbor = solution.copy()
+        pending = np.arange(len(solution))  # 尚未找到可行邻域解的候选解下标
+
+        for _ in range(self.check_num):
+            current = solution[pending]
+            interval = self.feasible_interval(current) if self.feasible_interval is not None else None
+            trial = self.perturb(current, step[pending, None], interval)
+            feasible = self.is_feasible(trial)
+            neighbor[pending[feasible]] = trial[feasible]
+            pending = pending[~feasible]
+            if len(pending) == 0:
+                break
+
+        # 若是没有找到邻域内的可行解，那么有一半的概率用前一个解代替，也有一半的概率保持当前值不变；
+        # 各行是独立的链（同步多起点、并行回火的副本）时保持当前值不变
+        if self.multi_start or self.independent_rows:
+            return neighbor
+        pending = pending[pending > 0]
+        replaced = pending[self.np_rng.random(len(pending)) < 0.5]
+        neighbor[replaced] = neighbor[replaced - 1]
+        return neighbor
+
+    def screen_neighbors(self, solution, step=None):
+        """
+        代理模型预筛选：每个候选解生成surrogate_candidates个邻域解，只保留代理模型预测函数值最小的一个；
+        代理模型的评估点不足时直接返回一组邻域解
+        """
+        if not self.surrogate.ready(self.x_num) or self.surrogate_candidates == 1:
+            return self.neighbor_solution_batch(solution, step)
+
+        pool = np.stack([self.neighbor_solution_batch(solution, step) for _ in range(self.surrogate_candidates)])
+        n = len(solution)
+        predicted = self.surrogate.predict(pool.reshape(-1, self.x_num)).reshape(self.surrogate_candidates, n)
+        self.stats['surrogate_avoided'] += (self.surrogate_candidates - 1) * n
+        return pool[np.argmin(predicted, axis=0), np.arange(n)]
+
+    def acceptance_probability(self, new_fitness, current_fitness, temperature=None):
         """
         默认的接受概率函数，基于Metropolis准则。
         用户可以根据需要替换为其他选择概率函数。
+        :param temperature: 计算概率所用的温度，默认为当前温度；
+                            传入ndarray时new_fitness与current_fitness也可以是ndarray，逐元素返回接受概率
         """
+        if temperature is None:
+            temperature = self.temperature
+
         if self.prob_type == 'Metropolis':
+            if np.ndim(new_fitness) or np.ndim(temperature):
+                exponent = np.minimum((current_fitness - new_fitness) / temperature, 0)
+                return np.where(new_fitness < current_fitness, 1.0, np.maximum(np.exp(exponent), 0.01))
             if new_fitness < current_fitness:
                 return 1
             else:
                 # print(math.exp((current_fitness - new_fitness) / self.temperature))
-                return max(math.exp((current_fitness - new_fitness) / self.temperature), 0.01)
+                return max(math.exp((current_fitness - new_fitness) / temperature), 0.01)
 
         else:
-            return self.prob(new_fitness, current_fitness)
+            # 温度与Metropolis准则一样传入，并行回火中为各副本的温度阶梯
+            prob = self.prob_type if callable(self.prob_type) else self.prob
+            return prob(new_fitness, current_fitness, temperature)
+
+    def evaluate(self, solutions):
+        """
+        计算候选解集中每个候选解的函数值，批量模式下一次调用目标函数评估整个候选解集
+        :return: 函数值列表，批量模式下为(n_candidates,)的ndarray
+        """
+        self.stats['evaluations'] += len(solutions)
+        if self.vectorized:
+            fitness = np.asarray(self.objective_function(solutions), dtype=float)
+            if self.surrogate is not None:
+                self.surrogate.add(solutions, fitness)
+            return fitness
+        if self.evaluator is not None:
+            return self.evaluator.map(solutions)
+        return [self.objective_function(solutions[j]) for j in range(len(solutions))]
+
+    def copy_solution(self, solution):
+        """复制单个候选解，用于保存历史最优解"""
+        if isinstance(solution, (list, np.ndarray)):
+            return solution.copy()
+        return solution
 
     def best(self):
         """
         获得当前候选解集中最优解的函数值以及最优解
         :return:
         """
-        f_list = []  # f_list数组保存每次迭代之后的值
-        for i in self.current_solution:
-            f = self.objective_function(i)
-            f_list.append(f)
+        f_list = self.current_fitness  # 直接使用缓存的函数值，无需重新计算
+        if self.vectorized:
+            idx = int(np.argmin(f_list))
+            return float(f_list[idx]), self.current_solution[idx]
 
         f_best = min(f_list)
         idx = f_list.index(f_best)
         return f_best, self.current_solution[idx]  # f_best,idx分别为在该温度下的函数最优值以及对应的变量的取值
 
+    def step(self):
+        """
+        执行一个温度层级：内循环迭代num_iterations次，记录该温度下的最优解，然后降温
+        :return: 该温度下候选解集的最优函数值
+        """
+        phase_start = time.perf_counter()
+        accepted = 0
+        # 内循环迭代
+        iterations = 0
+        for i in range(self.num_iterations):
+            if self.budget_exhausted():
+                break
+            iterations += 1
+            f = np.min(self.current_fitness)  # 当前解的函数值直接取缓存
+
+            moves = None
+            if self.surrogate is not None:
+                new_sol = self.screen_neighbors(self.current_solution)  # 代理模型预筛选产生新解
+                new_fitness = self.evaluate(new_sol)
+            elif self.delta_objective is None and not self.permutation:
+                new_sol = self.neighbor_solution(self.current_solution)  # 产生新解
+                new_fitness = self.evaluate(new_sol)  # 产生新值
+            else:
+                moves, new_fitness = self.neighbor_moves(self.current_solution)  # 产生邻域移动并增量计算新值
+            if self.multi_start:
+                accepted += self.accept_rows(new_sol if moves is None else None, moves, new_fitness)
+                continue
+
+            f_new = np.min(new_fitness)
+
+            if self.rng.random() <= self.acceptance_probability(f_new, f):
+                if self.delta_objective is None and not self.permutation:
+                    self.current_solution = new_sol
+                else:
+                    self.apply_moves(self.current_solution, moves)
+                self.current_fitness = new_fitness
+                accepted += 1
+        # 同步多起点时按链计数，接受率为被接受的邻域解占全部邻域解的比例
+        chains = len(self.current_solution) if self.multi_start else 1
+        self.acceptance_ratio = accepted / max(iterations * chains, 1)
+
+        # 迭代L次记录在该温度下最优解
+        best_fitness, best_sol = self.best()
+        self.fitness_history.append(best_fitness)
+        if best_fitness < self.best_fitness:
+            self.best_fitness = best_fitness
+            self.best_solution = self.copy_solution(best_sol)
+            self.stagnation = 0
+        else:
+            self.stagnation += 1
+
+        if self.verbose:
+            print(f'当前优化轮数：{self.count+1}，当前温度值：{self.temperature}, 接受率：{self.acceptance_ratio:.2f}，'
+                  f'当前迭代最优解：{best_sol}，最优函数值：{best_fitness}')
+        if self.telemetry is not None:
+            self.telemetry.record(self.__class__.__name__, 'temperature', step=self.count + 1,
+                                  temperature=self.temperature, acceptance_ratio=self.acceptance_ratio,
+                                  level_best=best_fitness, best_fitness=self.best_fitness,
+                                  phase_time=time.perf_counter() - phase_start, **self.stats)
+        # 按冷却方案降温；最优解长期没有改进时回温，帮助跳出局部最优
+        self.temperature = self.cooling.next_temperature(self.temperature, self.acceptance_ratio)
+        if self.reheat_patience and self.stagnation and self.stagnation % self.reheat_patience == 0:
+            self.temperature = min(self.temperature * self.reheat_factor, self.initial_temperature)
+        self.count += 1
+        return best_fitness
+
+    def accept_rows(self, new_sol, moves, new_fitness):
+        """
+        同步多起点的Metropolis步：用一组均匀随机数逐行判断是否接受新解，只更新被接受的链
+        :param new_sol: 整个候选解集的邻域解，使用邻域移动时为None
+        :param moves: 邻域移动(idx, new_values)，不使用时为None
+        :return: 被接受的链数
+        """
+        prob = self.acceptance_probability(new_fitness, self.current_fitness)
+        accepted = self.np_rng.random(len(new_fitness)) <= prob
+        if moves is None:
+            self.current_solution[accepted] = new_sol[accepted]
+        else:
+            idx, new_values = moves
+            rows = np.flatnonzero(accepted)
+            self.current_solution[rows[:, None], idx[rows]] = new_values[rows]
+        self.current_fitness[accepted] = new_fitness[accepted]
+        return int(np.sum(accepted))
+
+    def budget_exhausted(self):
+        """真实评估次数是否用完max_evaluations的预算"""
+        return self.max_evaluations is not None and self.stats['evaluations'] >= self.max_evaluations
+
+    def finished(self):
+        """判断退火是否结束：当前温度不高于终止温度，最优解连续stagnation_patience个温度层级没有改进，或者真实评估次数用完预算"""
+        if self.budget_exhausted():
+            return True
+        if self.stagnation_patience and self.stagnation >= self.stagnation_patience:
+            return True
+        return self.temperature <= self.temperature_end
+
+    def inject(self, solution, fitness):
+        """
+        将外部的解（如其他退火链的最优解）注入当前候选解集，替换其中最差的候选解
+        """
+        if self.vectorized:
+            worst = int(np.argmax(self.current_fitness))
+        else:
+            worst = self.current_fitness.index(max(self.current_fitness))
+        self.current_solution[worst] = self.copy_solution(solution)
+        self.current_fitness[worst] = fitness
+        if fitness < self.best_fitness:
+            self.best_fitness = fitness
+            self.best_solution = self.copy_solution(solution)
+            self.stagnation = 0
+
     def solve(self):
         """
         模拟退火主函数入口
-        :return:
+        :return: 搜索过程中的历史最优函数值以及对应的解
         """
-        result = []
-        acceptance_probability_func = self.acceptance_probability
-        count = 0
         # 外循环迭代，当前温度小于终止温度的阈值
-        while self.temperature > self.temperature_end:
+        try:
+            while not self.finished():
+                self.step()
+                self.maybe_checkpoint(self.count)
+        finally:
+            # 关闭并发评估按需创建的线程池，再次求解时重新创建
+            if self.evaluator is not None:
+                self.evaluator.close()
+        self.flush_checkpoints()
+
+        # 得到搜索过程中的历史最优解
+        return self.best_fitness, self.best_solution
+
+class ParallelTempering(SimulatedAnnealing):
+    # 每行是不同温度的副本，状态只能通过副本交换在温度之间移动
+    independent_rows = True
 
-            # 内循环迭代
-            for i in range(self.num_iterations):
-                f = min([self.objective_function(self.current_solution[j]) for j in range(len(self.current_solution))])
-                new_sol = self.neighbor_solution(self.current_solution)  # 产生新解
+    def __init__(self, **kwargs):
+        """
+        并行回火（副本交换）算法，只支持批量模式，objective_function与constraint需为批量版本
+        每个副本对应温度阶梯上的一个温度，所有副本组成(n_replicas, x_num)的ndarray同步推进，
+        一次批量评估即可完成整个温度阶梯的Metropolis步；每个步骤结束后相邻温度的副本按交换准则交换
+        :param n_replicas: 副本数量，即温度阶梯的级数
+        :param temperatures: 温度阶梯，默认在temperature_end与temperature之间按几何级数取n_replicas个温度
+        :param max_steps: 步骤数，每个步骤包含num_iterations次Metropolis迭代和一次副本交换
+        其余参数与SimulatedAnnealing相同
+        """
+        pt_params = {
+            'n_replicas': 8,
+            'temperatures': None,
+            'max_steps': 200
+        }
+        for key, value in pt_params.items():
+            setattr(self, key, kwargs.pop(key, value))
 
-                f_new = min([self.objective_function(new_sol[j]) for j in range(len(new_sol))])  # 产生新值
+        if not isinstance(self.max_steps, int) or self.max_steps < 1:
+            raise ValueError(f"请输入正确的max_steps")
 
-                if random.random() <= acceptance_probability_func(f_new, f):
-                    self.current_solution = new_sol
+        if self.temperatures is not None:
+            self.n_replicas = len(self.temperatures)
+
+        if not isinstance(self.n_replicas, int) or self.n_replicas < 2:
+            raise ValueError(f"请输入正确的n_replicas")
+
+        kwargs['vectorized'] = True
+        super().__init__(**kwargs)
+        if len(self.initial_solution) != self.n_replicas:
+            raise ValueError(f"请输入正确的initial_solution，行数应与温度个数{self.n_replicas}一致")
+
+        if self.temperatures is None:
+            self.temperatures = np.geomspace(self.temperature_end, self.temperature, self.n_replicas)
+        self.temperatures = np.sort(np.asarray(self.temperatures, dtype=float))  # 下标0为最低温度
 
-            # 迭代L次记录在该温度下最优解
-            best_fitness, best_sol = self.best()
-            result.append(best_fitness)
+        # 相邻副本交换的尝试次数与成功次数
+        self.swap_attempts = np.zeros(self.n_replicas - 1, dtype=int)
+        self.swap_accepts = np.zeros(self.n_replicas - 1, dtype=int)
 
-            print(f'当前优化轮数：{count+1}，当前温度值：{self.temperature}, 当前迭代最优解：{best_sol}，最优函数值：{best_fitness}')
-            # 温度按照一定的比例下降（冷却）
-            self.temperature = self.temperature * self.cooling_rate
-            count += 1
+    def initial_sol(self):
+        """
+        初始化副本，每个温度一个副本
+        :return: 形状为(n_replicas, x_num)的ndarray
+        """
+        return self.sample_initial(self.n_replicas)
+
+    def metropolis_sweep(self):
+        """
+        所有副本同时执行一次Metropolis步：步长与各自温度成正比，接受概率按各自温度计算
+        """
+        if self.surrogate is not None:
+            new_sol = self.screen_neighbors(self.current_solution, self.temperatures * self.coefficient)
+        else:
+            new_sol = self.neighbor_solution_batch(self.current_solution, self.temperatures * self.coefficient)
+        new_fitness = self.evaluate(new_sol)
+        prob = self.acceptance_probability(new_fitness, self.current_fitness, self.temperatures)
+        accepted = self.np_rng.random(self.n_replicas) <= prob
+
+        self.current_solution[accepted] = new_sol[accepted]
+        self.current_fitness[accepted] = new_fitness[accepted]
+        return int(np.sum(accepted))
+
+    def replica_exchange(self):
+        """
+        相邻温度的副本交换：交替尝试偶数对(0,1),(2,3)...与奇数对(1,2),(3,4)...
+        交换概率为 min(1, exp((1/T_i - 1/T_j) * (E_i - E_j)))
+        """
+        i = np.arange(self.count % 2, self.n_replicas - 1, 2)
+        j = i + 1
+        beta = 1 / self.temperatures
+        exponent = np.minimum((beta[i] - beta[j]) * (self.current_fitness[i] - self.current_fitness[j]), 0)
+        swapped = self.np_rng.random(len(i)) < np.exp(exponent)
+
+        self.swap_attempts[i] += 1
+        self.swap_accepts[i[swapped]] += 1
+
+        i, j = i[swapped], j[swapped]
+        self.current_solution[np.concatenate([i, j])] = self.current_solution[np.concatenate([j, i])]
+        self.current_fitness[np.concatenate([i, j])] = self.current_fitness[np.concatenate([j, i])]
+
+    def step(self):
+        """
+        执行一个步骤：num_iterations次Metropolis迭代后进行一次副本交换
+        :return: 所有副本中的最优函数值
+        """
+        phase_start = time.perf_counter()
+        accepted = 0
+        for _ in range(self.num_iterations):
+            accepted += self.metropolis_sweep()
+        self.replica_exchange()
+        self.acceptance_ratio = accepted / (self.num_iterations * self.n_replicas)
 
-            # 得到最优解
         best_fitness, best_sol = self.best()
-        return best_fitness, best_sol
+        self.fitness_history.append(best_fitness)
+        if best_fitness < self.best_fitness:
+            self.best_fitness = best_fitness
+            self.best_solution = self.copy_solution(best_sol)
+
+        if self.verbose:
+            print(f'当前步骤：{self.count+1}，最低温度副本函数值：{self.current_fitness[0]}，最优函数值：{best_fitness}')
+        if self.telemetry is not None:
+            self.telemetry.record(self.__class__.__name__, 'step', step=self.count + 1,
+                                  acceptance_ratio=self.acceptance_ratio, level_best=best_fitness,
+                                  best_fitness=self.best_fitness, phase_time=time.perf_counter() - phase_start,
+                                  **self.stats)
+        self.count += 1
+        return best_fitness
+
+    def finished(self):
+        """判断是否达到最大步骤数，或者真实评估次数用完预算"""
+        return self.count >= self.max_steps or self.budget_exhausted()
+
+    def swap_rates(self):
+        """相邻副本的交换成功率，可用于调整温度阶梯"""
+        return self.swap_accepts / np.maximum(self.swap_attempts, 1)
 
 
 if __name__ == '__main__':
 
     obj = ObjectiveFunctions.mixed_function
     cons = Constraints.box_constraint
-    a = SimulatedAnnealing(objective_function=obj, constraint=cons, x_num=1)
+    a = SimulatedAnnealing(objective_function=obj, constraint=cons, x_num=1, verbose=True)
     a.solve()
     print(a.best_fitness)
     print(a.current_solution)
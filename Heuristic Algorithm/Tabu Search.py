@@ -0,0 +1,329 @@
+# -*-coding: Utf-8 -*-
+# @File : Tabu Search.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+禁忌搜索算法包
+1. 与SimulatedAnnealing相同的参数约定：objective_function、constraint、opt_type、delta_objective、initial_solution等
+2. 整数编码（如背包问题）：邻域为加一（add）、减一（drop）、一个变量减一同时另一个变量加一（swap），
+   移动表示为(idx, new_values)，定义delta_objective后每个移动只需O(1)的增量计算
+3. 排列编码（permutation=True，如TSP）：邻域为全部2-opt移动，根据距离矩阵O(1)增量计算回路长度
+4. 禁忌表为字典：键为移动的属性（整数编码为(变量下标, 原取值)，排列编码为被删除的边），值为解禁的迭代轮数，
+   判断一个移动是否被禁忌只需O(1)的字典查询
+5. 特赦准则：被禁忌的移动若能得到优于历史最优解的解，仍然可以执行
+"""
+
+import random
+import time
+import numpy as np
+from functools import partial
+from samples import ObjectiveFunctions, Constraints
+from checkpoint import Checkpointable
+from permutation import TwoOptMove, random_tour
+
+
+class TabuSearch(Checkpointable):
+    def __init__(self, **kwargs):
+        """
+        :param initial_solution: 初始解，以列表的形式，默认整数编码为全0，排列编码为随机回路
+        :param x_num: 变量个数
+        :param minx: 变量最小值，可以是数或列表
+        :param maxx: 变量最大值，可以是数或列表（如背包问题的max_num）
+        :param objective_function: 目标函数
+        :param opt_type: 'max', 'min'
+        :param constraint: 约束条件【输入自变量形式，返回True or False】
+        :param delta_objective: 增量目标函数 delta_objective(solution, move)，返回执行移动move后函数值的变化量，
+                                move为(idx, new_values)，如partial(ObjectiveFunctions.knapsack_delta, values=values)；
+                                默认为None即对每个邻域解完整计算目标函数
+        :param tenure: 禁忌长度，执行移动后其反向移动在tenure轮迭代内被禁忌
+        :param max_iter: 最大迭代轮数
+        :param stagnation_patience: 连续多少轮迭代最优解没有改进时提前终止，默认不提前终止
+        :param candidate_num: 每轮迭代最多评估的邻域移动个数，超出时随机抽取，默认为None即评估全部邻域
+        :param permutation: 是否使用排列编码，启用后邻域为2-opt移动，函数值由distance_matrix增量计算，
+                            objective_function默认为回路长度，constraint可以不定义
+        :param distance_matrix: 排列编码下的距离矩阵，要求对称，x_num默认为其城市数量
+        :param seed: 随机数种子
+        :param verbose: 是否在每轮迭代打印当前解与最优解，默认不打印
+        :param telemetry: Telemetry实例，用于按迭代轮数记录运行指标，默认为None即不记录
+        :param checkpoint_path: 断点文件路径，默认为None即不保存断点
+        :param checkpoint_interval: 每隔多少轮迭代保存一次断点
+        """
+
+        # 支持传入字典参数，也可以传入值参数修改默认的字典参数
+        default_params = {
+            'initial_solution': None,
+            'x_num': None,
+            'minx': 0,
+            'maxx': 9999,
+            'objective_function': None,
+            'constraint': None,
+            'opt_type': 'min',
+            'delta_objective': None,
+            'tenure': 7,
+            'max_iter': 1000,
+            'stagnation_patience': None,
+            'candidate_num': None,
+            'permutation': False,
+            'distance_matrix': None,
+            'seed': None,
+            'verbose': False,
+            'telemetry': None,
+            'checkpoint_path': None,
+            'checkpoint_interval': 10
+        }
+        if 'opt_type' in kwargs and kwargs['opt_type'] not in ['max', 'min']:
+            raise ValueError(f"请输入正确的opt_type")
+
+        if 'tenure' in kwargs and (not isinstance(kwargs['tenure'], int) or kwargs['tenure'] < 0):
+            raise ValueError(f"请输入正确的tenure")
+
+        if 'max_iter' in kwargs and not isinstance(kwargs['max_iter'], int):
+            raise ValueError(f"请输入正确的max_iter")
+
+        if kwargs.get('permutation'):
+            if kwargs.get('distance_matrix') is None:
+                raise ValueError(f"排列编码下需要定义距离矩阵distance_matrix")
+            if kwargs.get('objective_function') is None:
+                kwargs['objective_function'] = partial(ObjectiveFunctions.tour_length,
+                                                       dist_matrix=kwargs['distance_matrix'])
+            kwargs.setdefault('x_num', len(kwargs['distance_matrix']))
+        else:
+            for key in ['objective_function', 'constraint']:
+                if key not in kwargs or kwargs[key] is None:
+                    raise ValueError(f"参数{key}未定义，请重新输入")
+
+        # 先将默认参数设置到实例上
+        for key, value in default_params.items():
+            setattr(self, key, value)
+
+        # 再根据传入的关键字参数更新实例属性
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+        self.rng = random.Random(self.seed)
+        self.np_rng = np.random.default_rng(self.seed)
+
+        # 统计信息：完整评估次数、增量评估次数、约束调用次数、被禁忌的移动次数、特赦次数
+        self.stats = {'evaluations': 0, 'delta_evaluations': 0, 'constraint_calls': 0, 'tabu_hits': 0,
+                      'aspirations': 0}
+
+        if self.initial_solution is None:
+            if self.x_num is None:
+                raise ValueError(f"未定义初始解时需要定义变量个数x_num")
+            self.initial_solution = random_tour(self.x_num, self.rng) if self.permutation else \
+                [int(v) for v in np.broadcast_to(self.minx, (self.x_num,))]
+        self.current_solution = list(self.initial_solution)
+        self.x_num = len(self.current_solution)
+        self.lower = np.broadcast_to(self.minx, (self.x_num,)).tolist()
+        self.upper = np.broadcast_to(self.maxx, (self.x_num,)).tolist()
+
+        if self.constraint is not None and not self.is_feasible(self.current_solution):
+            raise ValueError(f"初始解不满足约束条件，请重新定义初始解")
+
+        # 内部统一转换为最小化
+        self.sign = 1 if self.opt_type == 'min' else -1
+        self.current_fitness = self.evaluate(self.current_solution)
+        self.best_fitness = self.current_fitness
+        self.best_solution = list(self.current_solution)
+
+        self.tabu = {}  # 禁忌表：移动属性 -> 解禁的迭代轮数
+        self.count = 0  # 已完成的迭代轮数
+        self.stagnation = 0  # 最优解连续没有改进的迭代轮数
+        self.fitness_history = []  # 每轮迭代后当前解的函数值
+
+    def evaluate(self, solution):
+        """计算单个解的函数值（统一为最小化）"""
+        self.stats['evaluations'] += 1
+        return self.sign * self.objective_function(solution)
+
+    def is_feasible(self, solution):
+        """判断解是否满足约束条件，并统计约束条件的调用次数"""
+        self.stats['constraint_calls'] += 1
+        return self.constraint(solution)
+
+    def integer_moves(self):
+        """
+        整数编码的邻域移动：加一、减一以及一个变量减一同时另一个变量加一
+        :return: 移动(idx, new_values)的列表
+        """
+        x, lower, upper = self.current_solution, self.lower, self.upper
+        up = [i for i in range(self.x_num) if x[i] + 1 <= upper[i]]
+        down = [i for i in range(self.x_num) if x[i] - 1 >= lower[i]]
+        moves = [((i,), (x[i] + 1,)) for i in up] + [((i,), (x[i] - 1,)) for i in down]
+        moves += [((i, j), (x[i] - 1, x[j] + 1)) for i in down for j in up if i != j]
+        return moves
+
+    def permutation_moves(self):
+        """排列编码的邻域移动：全部2-opt移动(i, j)"""
+        n = self.x_num
+        return [(i, j) for i in range(n - 1) for j in range(i + 1, n) if j - i < n - 1]
+
+    def move_delta(self, move):
+        """
+        执行移动后函数值（最小化）的变化量，定义了约束时先检查约束，不满足约束时返回None
+        """
+        x = self.current_solution
+        if self.permutation:
+            if self.constraint is not None:
+                trial = list(x)
+                TwoOptMove.apply(trial, move)
+                if not self.is_feasible(trial):
+                    return None
+            self.stats['delta_evaluations'] += 1
+            return self.sign * TwoOptMove.delta(x, self.distance_matrix, move)
+
+        # 检查约束与完整计算目标函数时临时在当前解上修改，计算后立即恢复
+        idx, new_values = move
+        old_values = [x[i] for i in idx]
+        for i, v in zip(idx, new_values):
+            x[i] = v
+        try:
+            if self.constraint is not None and not self.is_feasible(x):
+                return None
+            if self.delta_objective is None:
+                return self.evaluate(x) - self.current_fitness
+        finally:
+            for i, v in zip(idx, old_values):
+                x[i] = v
+        self.stats['delta_evaluations'] += 1
+        return self.sign * self.delta_objective(x, move)
+
+    def move_attributes(self, move):
+        """
+        移动会引入的属性：整数编码为(变量下标, 新取值)，排列编码为新增加的边；
+        属性在禁忌表中时说明该移动会撤销最近的移动
+        """
+        x = self.current_solution
+        if self.permutation:
+            i, j = move
+            a, b, c, d = x[i - 1], x[i], x[j], x[(j + 1) % self.x_num]
+            return [(min(a, c), max(a, c)), (min(b, d), max(b, d))]
+        return list(zip(*move))
+
+    def reverse_attributes(self, move):
+        """
+        执行移动后需要禁忌的属性：整数编码为(变量下标, 原取值)，排列编码为被删除的边
+        """
+        x = self.current_solution
+        if self.permutation:
+            i, j = move
+            a, b, c, d = x[i - 1], x[i], x[j], x[(j + 1) % self.x_num]
+            return [(min(a, b), max(a, b)), (min(c, d), max(c, d))]
+        idx, _ = move
+        return [(i, x[i]) for i in idx]
+
+    def is_tabu(self, move):
+        """判断移动是否被禁忌"""
+        return any(self.tabu.get(attribute, -1) > self.count for attribute in self.move_attributes(move))
+
+    def apply_move(self, move):
+        """执行移动，并把其反向属性加入禁忌表"""
+        for attribute in self.reverse_attributes(move):
+            self.tabu[attribute] = self.count + self.tenure + 1
+        if self.permutation:
+            TwoOptMove.apply(self.current_solution, move)
+        else:
+            for i, v in zip(*move):
+                self.current_solution[i] = v
+
+    def step(self):
+        """
+        执行一轮迭代：评估邻域内的全部移动，选择未被禁忌（或满足特赦准则）的最优移动并执行
+        :return: 执行移动后当前解的函数值，没有可行移动时返回None
+        """
+        phase_start = time.perf_counter()
+        moves = self.permutation_moves() if self.permutation else self.integer_moves()
+        if self.candidate_num is not None and len(moves) > self.candidate_num:
+            moves = self.rng.sample(moves, self.candidate_num)
+
+        best_move, best_delta, aspiration = None, None, False
+        fallback_move, fallback_delta = None, None  # 全部移动都被禁忌时使用的最优移动
+        for move in moves:
+            delta = self.move_delta(move)
+            if delta is None:
+                continue
+            if self.is_tabu(move):
+                self.stats['tabu_hits'] += 1
+                # 特赦准则：得到优于历史最优解的解时，忽略禁忌
+                if self.current_fitness + delta < self.best_fitness and (best_delta is None or delta < best_delta):
+                    best_move, best_delta, aspiration = move, delta, True
+                elif fallback_delta is None or delta < fallback_delta:
+                    fallback_move, fallback_delta = move, delta
+            elif best_delta is None or delta < best_delta:
+                best_move, best_delta, aspiration = move, delta, False
+
+        if best_move is None:
+            best_move, best_delta = fallback_move, fallback_delta
+        if best_move is None:
+            self.count += 1
+            self.stagnation += 1
+            return None
+        self.stats['aspirations'] += aspiration
+
+        self.apply_move(best_move)
+        self.current_fitness += best_delta
+        self.fitness_history.append(self.sign * self.current_fitness)
+        if self.current_fitness < self.best_fitness:
+            self.best_fitness = self.current_fitness
+            self.best_solution = list(self.current_solution)
+            self.stagnation = 0
+        else:
+            self.stagnation += 1
+
+        # 清理已经解禁的属性，禁忌表的大小保持在O(tenure)量级
+        if self.count % (self.tenure + 1) == 0:
+            self.tabu = {attribute: expiry for attribute, expiry in self.tabu.items() if expiry > self.count}
+
+        if self.verbose:
+            print(f'当前迭代轮数：{self.count+1}，当前解函数值：{self.sign * self.current_fitness}，'
+                  f'最优函数值：{self.sign * self.best_fitness}')
+        if self.telemetry is not None:
+            self.telemetry.record(self.__class__.__name__, 'iteration', step=self.count + 1,
+                                  current_fitness=self.sign * self.current_fitness,
+                                  best_fitness=self.sign * self.best_fitness,
+                                  phase_time=time.perf_counter() - phase_start, **self.stats)
+        self.count += 1
+        return self.sign * self.current_fitness
+
+    def finished(self):
+        """判断搜索是否结束：达到最大迭代轮数，或者最优解连续stagnation_patience轮迭代没有改进"""
+        if self.stagnation_patience and self.stagnation >= self.stagnation_patience:
+            return True
+        return self.count >= self.max_iter
+
+    def solve(self):
+        """
+        禁忌搜索主函数入口
+        :return: 搜索过程中的历史最优函数值以及对应的解
+        """
+        while not self.finished():
+            self.step()
+            self.maybe_checkpoint(self.count)
+        self.flush_checkpoints()
+
+        return self.sign * self.best_fitness, self.best_solution
+
+
+if __name__ == '__main__':
+    # 背包问题：与SMA_for_knapsack.py相同的算例，使用增量目标函数
+    values = [2, 6, 5, 7, 8, 9, 4, 6, 8, 11, 7, 10, 5, 4, 5, 8]
+    weights = [3, 4, 2, 5, 6, 7, 4, 5, 6, 9, 7, 8, 5, 4, 5, 6]
+    max_num = [5, 3, 7, 8, 7, 7, 5, 4, 7, 3, 7, 6, 7, 8, 7, 8]
+    ts = TabuSearch(objective_function=partial(ObjectiveFunctions.knapsack_objective, values=values),
+                    delta_objective=partial(ObjectiveFunctions.knapsack_delta, values=values),
+                    constraint=partial(Constraints.knapsack_constraint, weights=weights, max_num=max_num,
+                                       max_weight=400),
+                    x_num=len(values), minx=0, maxx=max_num, opt_type='max', max_iter=300, stagnation_patience=100)
+    best_fitness, best_solution = ts.solve()
+    print(f"背包问题：最优的目标函数值为：{best_fitness}，最优解为：{best_solution}，迭代轮数：{ts.count}")
+
+    # TSP：与第4章相同方式生成的随机城市
+    from permutation import distance_matrix
+    random.seed(42)
+    city_loc = [(random.randint(1, 100), random.randint(1, 100)) for _ in range(30)]
+    ts = TabuSearch(permutation=True, distance_matrix=distance_matrix(city_loc), seed=42, max_iter=500,
+                    stagnation_patience=100)
+    best_fitness, best_solution = ts.solve()
+    print(f"TSP：最短路径为：{best_solution}，距离 = {best_fitness}，迭代轮数：{ts.count}")
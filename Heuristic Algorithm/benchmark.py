@@ -0,0 +1,235 @@
+# -*-coding: Utf-8 -*-
+# @File : benchmark.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+启发式算法包的基准测试
+1. run：在samples.py的目标函数（模拟退火、实数编码遗传算法）与随机生成的背包问题（背包遗传算法）上，
+   按不同维度与随机数种子运行求解器，记录运行时间、评估次数、最优值以及达到目标值的时间（由Telemetry的记录得到），
+   结果保存为JSON或CSV基线文件
+2. compare：比较两次运行的结果，运行时间变慢超过容差、最优值变差或者不再达到目标值时标记为退化，存在退化时返回码为1
+目标值：连续函数为已知最小值加上每维target_tol，背包问题为动态规划求出的最优值
+用法：
+    python benchmark.py run --dims 5 10 --seeds 0 1 2 --output baseline.json
+    python benchmark.py compare baseline.json current.json --time-tolerance 0.2
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+from functools import partial
+import numpy as np
+from samples import ObjectiveFunctions, Constraints
+from telemetry import Telemetry
+from knapsack_dp import knapsack_dp
+from SMA_for_knapsack import SMAforknapsack
+from SMA_for_float import SMAforfloat
+
+# 文件名中含有空格，只能通过importlib导入
+SimulatedAnnealing = importlib.import_module("Simulated Annealing").SimulatedAnnealing
+
+# 连续目标函数目录，均在[-5, 5]的框约束下最小化
+OBJECTIVES = {
+    'sphere': ObjectiveFunctions.sphere_function_batch,
+    'rosenbrock': ObjectiveFunctions.rosenbrock_function_batch,
+    'absolute': ObjectiveFunctions.absolute_function_batch,
+    'step': ObjectiveFunctions.step_function_batch,
+    'mixed': ObjectiveFunctions.mixed_function_batch,
+    'piecewise': ObjectiveFunctions.piecewise_function_batch,
+    'discontinuous_periodic': ObjectiveFunctions.discontinuous_periodic_batch
+}
+LOWER, UPPER = -5, 5
+
+# 结果中用于对齐两次运行的字段
+KEY_FIELDS = ('solver', 'problem', 'dim', 'seed')
+
+
+def known_optimum(problem, dim):
+    """
+    连续目标函数在[-5, 5]上的最小值：Rosenbrock为0，其余函数都是各维度之和，用一维的密集网格求出单维最小值
+    """
+    if problem == 'rosenbrock':
+        return 0.0
+    grid = np.linspace(LOWER, UPPER, 200001).reshape(-1, 1)
+    return float(dim * np.min(OBJECTIVES[problem](grid)))
+
+
+def generate_knapsack(n_items, seed):
+    """
+    随机生成有界背包问题，背包容量为全部物品总重量的30%
+    :return: values, weights, max_num, max_weight
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(1, 21, n_items).tolist()
+    weights = rng.integers(1, 11, n_items).tolist()
+    max_num = rng.integers(1, 9, n_items).tolist()
+    max_weight = int(0.3 * np.dot(weights, max_num))
+    return values, weights, max_num, max_weight
+
+
+def time_to_target(telemetry, target, opt_type='min'):
+    """从Telemetry的记录中找出历史最优值第一次达到目标值的时间，未达到时返回None"""
+    for record in telemetry.records:
+        best = record['best_fitness']
+        if (best <= target) if opt_type == 'min' else (best >= target):
+            return record['elapsed']
+    return None
+
+
+def run_case(solver, problem, dim, seed, args):
+    """
+    运行一个基准测试用例
+    :return: 结果字典
+    """
+    telemetry = Telemetry()
+    opt_type = 'min'
+    start = time.perf_counter()
+
+    if solver == 'sa':
+        target = known_optimum(problem, dim) + args.target_tol * dim
+        model = SimulatedAnnealing(objective_function=OBJECTIVES[problem],
+                                   constraint=partial(Constraints.box_constraint_batch, lower=LOWER, upper=UPPER),
+                                   x_num=dim, minx=LOWER, maxx=UPPER, vectorized=True, seed=seed,
+                                   repair='reflect', temperature=10, temperature_end=0.01, cooling_rate=0.95,
+                                   num_iterations=50, coefficient=0.05, telemetry=telemetry)
+        best_value, _ = model.solve()
+    elif solver == 'float_ga':
+        target = known_optimum(problem, dim) + args.target_tol * dim
+        model = SMAforfloat(objective_function=OBJECTIVES[problem], x_num=dim, minx=LOWER, maxx=UPPER,
+                            population_size=args.population_size, max_iter=args.generations, seed=seed,
+                            telemetry=telemetry)
+        best_value, _ = model.solve()
+    else:
+        opt_type = 'max'
+        values, weights, max_num, max_weight = generate_knapsack(dim, seed)
+        target = knapsack_dp(values, weights, max_num, max_weight)[0]
+        model = SMAforknapsack(objective_function=ObjectiveFunctions.knapsack_objective_batch, values=values,
+                               constraint=Constraints.knapsack_constraint_batch, weights=weights, max_num=max_num,
+                               max_weight=max_weight, population_size=args.population_size,
+                               max_iter=args.generations, vectorized=True, seed=seed, telemetry=telemetry)
+        best_value, _ = model.solve()
+
+    wall_time = time.perf_counter() - start
+    ttt = time_to_target(telemetry, target, opt_type)
+    return {'solver': solver, 'problem': problem, 'dim': dim, 'seed': seed, 'wall_time': wall_time,
+            'evaluations': model.stats['evaluations'], 'best_value': float(best_value), 'target': target,
+            'time_to_target': ttt, 'reached': ttt is not None, 'opt_type': opt_type}
+
+
+def run(args):
+    """按求解器、问题、维度、种子依次运行全部用例，并保存结果"""
+    results = []
+    for solver in args.solvers:
+        problems = ['knapsack'] if solver == 'ga' else args.problems
+        for problem in problems:
+            for dim in args.dims:
+                for seed in args.seeds:
+                    result = run_case(solver, problem, dim, seed, args)
+                    results.append(result)
+                    print(f"{solver}，{problem}，维度：{dim}，种子：{seed}，运行时间：{result['wall_time']:.3f}秒，"
+                          f"评估次数：{result['evaluations']}，最优值：{result['best_value']:.6g}，"
+                          f"目标值：{result['target']:.6g}，达到目标的时间：{result['time_to_target']}")
+
+    metadata = {'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'python': platform.python_version(),
+                'numpy': np.__version__, 'machine': platform.machine(), 'argv': sys.argv[1:]}
+    save_results(args.output, results, metadata)
+    print(f"结果已保存到{args.output}")
+
+
+def save_results(path, results, metadata=None):
+    """按文件后缀保存为JSON（包含运行环境信息）或CSV"""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': metadata or {}, 'results': results}, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    """读取JSON或CSV基线文件，返回结果列表"""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, encoding='utf-8') as f:
+            results = list(csv.DictReader(f))
+        for result in results:
+            result['dim'], result['seed'] = int(result['dim']), int(result['seed'])
+            result['evaluations'] = int(result['evaluations'])
+            for key in ['wall_time', 'best_value', 'target']:
+                result[key] = float(result[key])
+            result['time_to_target'] = float(result['time_to_target']) if result['time_to_target'] else None
+            result['reached'] = result['reached'] == 'True'
+        return results
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(args):
+    """比较基线与当前结果，打印每个用例的变化并标记退化"""
+    baseline = {tuple(r[k] for k in KEY_FIELDS): r for r in load_results(args.baseline)}
+    current = {tuple(r[k] for k in KEY_FIELDS): r for r in load_results(args.current)}
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys(), key=str):
+        old, new = baseline[key], current[key]
+        flags = []
+        if new['wall_time'] > old['wall_time'] * (1 + args.time_tolerance) and \
+                new['wall_time'] - old['wall_time'] > args.min_time:
+            flags.append('变慢')
+        sign = 1 if old.get('opt_type', 'min') == 'min' else -1
+        if sign * (new['best_value'] - old['best_value']) > args.value_tolerance * max(abs(old['best_value']), 1):
+            flags.append('最优值变差')
+        if old['reached'] and not new['reached']:
+            flags.append('未达到目标')
+        regressions += bool(flags)
+        print(f"{'，'.join(map(str, key))}：运行时间 {old['wall_time']:.3f} -> {new['wall_time']:.3f}秒，"
+              f"最优值 {old['best_value']:.6g} -> {new['best_value']:.6g}"
+              + (f"  【退化：{'、'.join(flags)}】" if flags else ''))
+
+    missing = baseline.keys() - current.keys()
+    if missing:
+        print(f"当前结果缺少{len(missing)}个基线用例：{sorted(missing, key=str)}")
+    print(f"共比较{len(baseline.keys() & current.keys())}个用例，退化{regressions}个")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='启发式算法包的基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行基准测试并保存结果')
+    run_parser.add_argument('--solvers', nargs='+', default=['sa', 'float_ga', 'ga'], choices=['sa', 'float_ga', 'ga'],
+                            help='sa：模拟退火，float_ga：实数编码遗传算法，ga：背包遗传算法')
+    run_parser.add_argument('--problems', nargs='+', default=list(OBJECTIVES), choices=list(OBJECTIVES),
+                            help='连续目标函数，背包遗传算法始终使用随机生成的背包问题')
+    run_parser.add_argument('--dims', nargs='+', type=int, default=[5, 10, 20], help='变量个数/物品种类数')
+    run_parser.add_argument('--seeds', nargs='+', type=int, default=[0, 1, 2])
+    run_parser.add_argument('--population-size', type=int, default=200)
+    run_parser.add_argument('--generations', type=int, default=200)
+    run_parser.add_argument('--target-tol', type=float, default=0.1, help='连续函数的目标值为已知最小值加上每维target_tol')
+    run_parser.add_argument('--output', default='benchmark.json', help='结果文件，后缀为.csv时保存为CSV，否则为JSON')
+
+    compare_parser = subparsers.add_parser('compare', help='比较两次运行的结果')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--time-tolerance', type=float, default=0.2, help='运行时间允许增加的比例')
+    compare_parser.add_argument('--min-time', type=float, default=0.05, help='运行时间增加少于该秒数时不视为变慢')
+    compare_parser.add_argument('--value-tolerance', type=float, default=1e-6, help='最优值允许变差的相对比例')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# -*-coding: Utf-8 -*-
+# @File : checkpoint.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+长时间搜索的断点保存与恢复
+1. 求解器继承Checkpointable后，每隔checkpoint_interval个阶段（温度层级/代）把完整状态保存为一个pickle二进制文件：
+   温度、当前解与历史最优解、种群、函数值缓存、求解器自身的random/numpy随机数生成器状态，
+   以及全局random与np.random的状态（自定义目标函数或约束中可能用到全局随机数）
+2. 序列化在搜索线程中完成（相当于拍下当前状态的快照），写文件由后台线程完成，不阻塞搜索；
+   先写临时文件再原子替换，进程在写入过程中被中断也不会损坏已有的断点文件
+3. 通过 求解器类.resume(path, **overrides) 从断点继续搜索，结果与不中断时逐位一致
+注意：目标函数与约束条件必须可以被pickle（模块级函数或functools.partial，不能是lambda）；
+      telemetry不写入断点文件，恢复时可以通过overrides重新传入
+"""
+
+import os
+import pickle
+import queue
+import random
+import threading
+import numpy as np
+
+
+def get_global_rng_state():
+    """获取全局random与np.random的状态"""
+    return {'random': random.getstate(), 'numpy': np.random.get_state()}
+
+
+def set_global_rng_state(state):
+    """恢复全局random与np.random的状态"""
+    random.setstate(state['random'])
+    np.random.set_state(state['numpy'])
+
+
+def write_atomic(path, data):
+    """先写入临时文件并刷到磁盘，再原子替换目标文件"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    读取断点文件
+    :return: 字典，'solver'为求解器实例，'global_rng'为全局随机数生成器的状态
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class CheckpointWriter:
+    """后台写断点文件的线程，submit只把已经序列化好的字节放入队列"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                path, data = item
+                write_atomic(path, data)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def submit(self, path, data):
+        if self.error is not None:
+            raise RuntimeError(f"写入断点文件失败：{self.error}")
+        self.queue.put((path, data))
+
+    def flush(self):
+        """等待队列中的断点文件全部写完"""
+        self.queue.join()
+        if self.error is not None:
+            raise RuntimeError(f"写入断点文件失败：{self.error}")
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+
+class Checkpointable:
+    """
+    断点保存与恢复的混入类，求解器需要定义checkpoint_path与checkpoint_interval两个属性，
+    并且全部搜索状态都保存在实例属性上
+    """
+    # 不写入断点文件的属性：后台线程与并发评估的执行器无法被pickle，telemetry的计时只在当前进程内有效
+    checkpoint_exclude = ('checkpoint_writer', 'telemetry', 'executor')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self.checkpoint_exclude:
+            if key in state:
+                state[key] = None
+        return state
+
+    def checkpoint(self, path=None, block=False):
+        """
+        保存断点
+        :param path: 断点文件路径，默认为checkpoint_path
+        :param block: 是否等待写入完成，默认由后台线程异步写入
+        """
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError(f"请输入正确的checkpoint_path")
+
+        data = pickle.dumps({'solver': self, 'global_rng': get_global_rng_state()},
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        if block:
+            self.flush_checkpoints()
+            write_atomic(path, data)
+            return
+        if getattr(self, 'checkpoint_writer', None) is None:
+            self.checkpoint_writer = CheckpointWriter()
+        self.checkpoint_writer.submit(path, data)
+
+    def maybe_checkpoint(self, count):
+        """第count个阶段结束后，按checkpoint_interval判断是否需要保存断点"""
+        if self.checkpoint_path is not None and count % self.checkpoint_interval == 0:
+            self.checkpoint()
+
+    def flush_checkpoints(self):
+        """等待后台线程写完所有断点文件"""
+        if getattr(self, 'checkpoint_writer', None) is not None:
+            self.checkpoint_writer.flush()
+
+    @classmethod
+    def resume(cls, path, **overrides):
+        """
+        从断点文件恢复求解器，并恢复全局随机数生成器的状态，之后调用solve()即可继续搜索
+        :param path: 断点文件路径
+        :param overrides: 需要覆盖的属性，如max_iter、telemetry、checkpoint_path
+        """
+        state = load_checkpoint(path)
+        solver = state['solver']
+        if not isinstance(solver, cls):
+            raise ValueError(f"断点文件中的求解器类型为{type(solver).__name__}，与{cls.__name__}不一致")
+        set_global_rng_state(state['global_rng'])
+        for key, value in overrides.items():
+            setattr(solver, key, value)
+        return solver
@@ -0,0 +1,109 @@
+# -*-coding: Utf-8 -*-
+# @File : concurrent_eval.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+目标函数的并发评估
+目标函数需要调用本地仿真进程等I/O密集的操作时，逐个调用会一直阻塞等待。ConcurrentEvaluator把一整代种群或一批邻域解
+同时提交，用asyncio的信号量限制同时进行的调用数，结果按输入顺序收集，与逐个调用的结果完全一致
+1. 普通函数在线程池（或传入的executor）中运行，async def定义的协程函数直接在事件循环中运行
+2. 评估过程不使用求解器的随机数，给定随机数种子时搜索轨迹与逐个调用相同
+3. 保存断点时不保存线程池，恢复后重新创建；传入的executor同样不保存，恢复后改用默认线程池
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ConcurrentEvaluator:
+    def __init__(self, objective_function, max_concurrency=8, executor=None, timeout=None):
+        """
+        :param objective_function: 目标函数，输入单个解返回函数值，可以是普通函数或者async def定义的协程函数
+        :param max_concurrency: 同时进行的目标函数调用数上限
+        :param executor: 运行普通目标函数的concurrent.futures执行器，默认为max_concurrency个线程的线程池
+        :param timeout: 单次调用的超时秒数，超时抛出TimeoutError，默认为None即不限制
+        """
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise ValueError(f"请输入正确的max_concurrency")
+
+        self.objective_function = objective_function
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.timeout = timeout
+        self.is_async = inspect.iscoroutinefunction(objective_function)
+        self.own_executor = None  # 未传入executor时按需创建的线程池
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['executor'] = None
+        state['own_executor'] = None
+        return state
+
+    def get_executor(self):
+        if self.executor is not None:
+            return self.executor
+        if self.own_executor is None:
+            self.own_executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        return self.own_executor
+
+    async def gather(self, solutions):
+        """在当前事件循环中并发评估，结果按输入顺序返回"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+
+        async def run(x):
+            async with semaphore:
+                if self.is_async:
+                    call = self.objective_function(x)
+                else:
+                    call = loop.run_in_executor(self.get_executor(), self.objective_function, x)
+                return await asyncio.wait_for(call, self.timeout)
+
+        return list(await asyncio.gather(*(run(x) for x in solutions)))
+
+    def map(self, solutions):
+        """
+        并发评估一组解
+        :param solutions: 解的序列
+        :return: 函数值列表，顺序与solutions一致
+        """
+        solutions = list(solutions)
+        if not solutions:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.gather(solutions))
+        # 已有事件循环在运行（如Jupyter）时不能嵌套asyncio.run，改在单独的线程中运行
+        with ThreadPoolExecutor(max_workers=1) as runner:
+            return runner.submit(asyncio.run, self.gather(solutions)).result()
+
+    def close(self):
+        """关闭按需创建的线程池，传入的executor由调用方关闭"""
+        if self.own_executor is not None:
+            self.own_executor.shutdown()
+            self.own_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    import time
+
+    async def simulator(x):
+        # 模拟一次需要0.05秒的外部仿真调用
+        await asyncio.sleep(0.05)
+        return sum(v ** 2 for v in x)
+
+    solutions = [[i, i + 1] for i in range(40)]
+    with ConcurrentEvaluator(simulator, max_concurrency=10) as evaluator:
+        start = time.perf_counter()
+        results = evaluator.map(solutions)
+        print(f"并发评估{len(solutions)}个解，耗时：{time.perf_counter() - start:.3f}秒，结果：{results[:5]}")
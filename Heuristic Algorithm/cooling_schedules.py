@@ -0,0 +1,78 @@
+# -*-coding: Utf-8 -*-
+# @File : cooling_schedules.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+模拟退火的冷却方案
+每个温度层级结束后，退火算法调用next_temperature(temperature, acceptance_ratio)得到下一个温度，
+acceptance_ratio为该温度层级内新解被接受的比例
+1. GeometricCooling：几何冷却 T <- rate * T
+2. LundyMeesCooling：Lundy-Mees冷却 T <- T / (1 + beta * T)，高温时降温快，低温时降温慢
+3. AdaptiveCooling：自适应冷却，根据接受率与目标接受率的差距调整冷却系数
+"""
+
+
+class CoolingSchedule:
+    """冷却方案基类，自定义冷却方案需继承该类并实现next_temperature"""
+
+    def next_temperature(self, temperature, acceptance_ratio):
+        raise NotImplementedError
+
+
+class GeometricCooling(CoolingSchedule):
+    def __init__(self, rate=0.99):
+        """
+        :param rate: 冷却系数
+        """
+        if not 0 < rate < 1:
+            raise ValueError(f"请输入正确的rate")
+        self.rate = rate
+
+    def next_temperature(self, temperature, acceptance_ratio):
+        return temperature * self.rate
+
+
+class LundyMeesCooling(CoolingSchedule):
+    def __init__(self, beta=1e-3):
+        """
+        :param beta: 冷却参数，越大降温越快
+        """
+        if beta <= 0:
+            raise ValueError(f"请输入正确的beta")
+        self.beta = beta
+
+    def next_temperature(self, temperature, acceptance_ratio):
+        return temperature / (1 + self.beta * temperature)
+
+
+class AdaptiveCooling(CoolingSchedule):
+    def __init__(self, rate=0.99, target_acceptance=0.4, min_rate=0.8, max_rate=0.999):
+        """
+        接受率高于目标时加快降温，低于目标时放慢降温：rate' = 1 - (1 - rate) * acceptance_ratio / target_acceptance
+        :param rate: 接受率恰好等于目标接受率时的冷却系数
+        :param target_acceptance: 目标接受率
+        :param min_rate: 冷却系数的下限（降温最快）
+        :param max_rate: 冷却系数的上限（降温最慢）
+        """
+        if not 0 < target_acceptance < 1:
+            raise ValueError(f"请输入正确的target_acceptance")
+        if not 0 < min_rate <= rate <= max_rate < 1:
+            raise ValueError(f"冷却系数需满足0 < min_rate <= rate <= max_rate < 1")
+        self.rate = rate
+        self.target_acceptance = target_acceptance
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+
+    def next_temperature(self, temperature, acceptance_ratio):
+        rate = 1 - (1 - self.rate) * acceptance_ratio / self.target_acceptance
+        return temperature * min(max(rate, self.min_rate), self.max_rate)
+
+
+# 内置冷却方案，SimulatedAnnealing的cooling_schedule参数可直接使用这些名称
+COOLING_SCHEDULES = {
+    'geometric': GeometricCooling,
+    'lundy_mees': LundyMeesCooling,
+    'adaptive': AdaptiveCooling
+}
@@ -0,0 +1,200 @@
+# -*-coding: Utf-8 -*-
+# @File : island_model.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+背包问题遗传算法的岛屿模型
+1. 每个岛屿是一个独立的SMAforknapsack种群，在单独的进程中运行，使用不同的随机数种子，可单独设置参数
+2. 每隔migration_interval代，各岛屿沿环形拓扑迁移：岛屿i把最优的migrants个个体发送给岛屿i+1，替换其最差的个体
+3. 迁移个体通过共享内存中的数组传递，所有岛屿写完后通过Barrier同步，再读取上一个岛屿的个体，读完后再同步一次
+4. 返回全局最优解以及每个岛屿的最优解
+注意：岛屿在子进程中创建，目标函数与约束条件必须可以被pickle（模块级函数或functools.partial，不能是lambda）
+"""
+
+import math
+import multiprocessing
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+from samples import ObjectiveFunctions, Constraints
+from SMA_for_knapsack import SMAforknapsack
+
+
+def run_island(rank, n_islands, params, epochs, migration_interval, migrants, shm_names, barrier, results):
+    """
+    子进程中运行一个岛屿，每个迁移周期先推进migration_interval代，再与相邻岛屿交换个体
+    :param shm_names: 共享内存的名称，分别保存迁移个体(n_islands, migrants, 物品个数)与其适应度(n_islands, migrants)
+    :param results: 队列，返回(rank, 最优函数值, 最优解, 统计信息)，出错时返回(rank, 异常信息)
+    """
+    individual_shm = fitness_shm = None
+    try:
+        island = SMAforknapsack(**params)
+        n_items = len(island.max_num)
+        individual_shm = shared_memory.SharedMemory(name=shm_names[0])
+        fitness_shm = shared_memory.SharedMemory(name=shm_names[1])
+        individuals = np.ndarray((n_islands, migrants, n_items), dtype=np.int64, buffer=individual_shm.buf)
+        fitness = np.ndarray((n_islands, migrants), dtype=np.float64, buffer=fitness_shm.buf)
+
+        for epoch in range(epochs):
+            for _ in range(migration_interval):
+                if island.finished():
+                    break
+                island.step()
+            if epoch == epochs - 1:
+                break
+
+            # 写入本岛屿的迁移个体，等待所有岛屿写完后读取上一个岛屿的个体，再等待所有岛屿读完
+            individuals[rank], fitness[rank] = island.emigrants(migrants)
+            barrier.wait()
+            source = (rank - 1) % n_islands
+            incoming, incoming_fitness = individuals[source].copy(), fitness[source].copy()
+            barrier.wait()
+            island.inject(incoming, incoming_fitness)
+
+        results.put((rank, island.best_objective_function, island.best_solution, island.stats))
+    except Exception as e:
+        # 让其他岛屿的Barrier立即失败，避免互相等待
+        barrier.abort()
+        results.put((rank, f'{type(e).__name__}: {e}'))
+    finally:
+        for shm in (individual_shm, fitness_shm):
+            if shm is not None:
+                shm.close()
+
+
+class IslandModel:
+    def __init__(self, n_islands=4, migration_interval=10, migrants=2, seed=None, island_params=None,
+                 verbose=False, **kwargs):
+        """
+        :param n_islands: 岛屿（进程）的数量
+        :param migration_interval: 每隔多少代迁移一次
+        :param migrants: 每次迁移每个岛屿发送的个体数
+        :param seed: 随机数种子，各岛屿的种子由它派生
+        :param island_params: 列表，每个元素是一个字典，用于单独覆盖对应岛屿的参数（如selection、mutation_rate）
+        :param verbose: 是否在结束后打印每个岛屿的最优解
+        :param kwargs: 其余参数原样传给每个岛屿的SMAforknapsack，包括目标函数、约束条件、物品参数、population_size、max_iter等
+        """
+        if not isinstance(n_islands, int) or n_islands < 2:
+            raise ValueError(f"请输入正确的n_islands")
+
+        if not isinstance(migration_interval, int) or migration_interval < 1:
+            raise ValueError(f"请输入正确的migration_interval")
+
+        if island_params is None:
+            island_params = [{} for _ in range(n_islands)]
+        if len(island_params) != n_islands:
+            raise ValueError(f"island_params的长度为{len(island_params)}，与岛屿数量{n_islands}不一致")
+        # 所有岛屿的迁移次数必须相同，否则Barrier会一直等待
+        if any('max_iter' in params for params in island_params):
+            raise ValueError(f"各岛屿的max_iter必须相同，请在kwargs中统一设置")
+
+        population_size = kwargs.get('population_size', 1000)
+        if not isinstance(migrants, int) or not 1 <= migrants <= min(population_size, *(
+                params.get('population_size', population_size) for params in island_params)):
+            raise ValueError(f"请输入正确的migrants")
+
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.max_iter = kwargs.get('max_iter', 1000)
+        self.n_items = len(kwargs['max_num'])
+        self.verbose = verbose
+
+        # 由同一个种子派生出互不相关的子种子，保证各岛屿独立且整体可复现
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_islands)]
+        # 岛屿在子进程中运行，不打印、不记录、不保存断点
+        self.island_params = [{**kwargs, 'verbose': False, 'telemetry': None, 'checkpoint_path': None,
+                               'seed': seeds[k], **island_params[k]} for k in range(n_islands)]
+
+        self.best_fitness = None
+        self.best_solution = None
+        self.island_results = None
+        self.island_stats = None  # 每个岛屿的评估次数、约束调用次数等统计信息
+
+    def collect(self, processes, results, barrier, poll_interval=1.0):
+        """
+        收集所有岛屿的结果。子进程被强制结束（内存不足被杀、目标函数段错误等）时不会返回结果，
+        每隔poll_interval秒检查一次子进程是否已异常退出，是则终止其余岛屿并报错，避免主进程一直等待
+        :return: 每个岛屿返回的结果列表
+        """
+        collected = []
+        while len(collected) < self.n_islands:
+            try:
+                collected.append(results.get(timeout=poll_interval))
+                continue
+            except queue.Empty:
+                pass
+            reported = {item[0] for item in collected}
+            dead = [k for k, process in enumerate(processes)
+                    if k not in reported and not process.is_alive() and process.exitcode != 0]
+            if dead:
+                barrier.abort()
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()
+                raise RuntimeError(f"岛屿{dead[0]}异常退出，退出码：{processes[dead[0]].exitcode}")
+        return collected
+
+    def solve(self):
+        """
+        岛屿模型主函数入口
+        :return: 全局最优函数值、全局最优解、每个岛屿的(最优函数值, 最优解)
+        """
+        epochs = math.ceil(self.max_iter / self.migration_interval)
+        individual_shm = shared_memory.SharedMemory(create=True,
+                                                    size=self.n_islands * self.migrants * self.n_items * 8)
+        fitness_shm = shared_memory.SharedMemory(create=True, size=self.n_islands * self.migrants * 8)
+        barrier = multiprocessing.Barrier(self.n_islands)
+        results = multiprocessing.Queue()
+
+        try:
+            processes = [multiprocessing.Process(target=run_island,
+                                                 args=(k, self.n_islands, self.island_params[k], epochs,
+                                                       self.migration_interval, self.migrants,
+                                                       (individual_shm.name, fitness_shm.name), barrier, results))
+                         for k in range(self.n_islands)]
+            for process in processes:
+                process.start()
+            # 先取结果再join，避免子进程因队列未被读取而无法退出
+            collected = self.collect(processes, results, barrier)
+            for process in processes:
+                process.join()
+        finally:
+            individual_shm.close()
+            individual_shm.unlink()
+            fitness_shm.close()
+            fitness_shm.unlink()
+
+        errors = [item for item in collected if len(item) == 2]
+        if errors:
+            # 其中一个岛屿出错后，其他岛屿会因Barrier失效而报错，优先报告第一个非Barrier的错误
+            errors.sort(key=lambda item: 'BrokenBarrierError' in item[1])
+            raise RuntimeError(f"岛屿{errors[0][0]}运行出错：{errors[0][1]}")
+
+        collected.sort(key=lambda item: item[0])
+        self.island_results = [(fitness, solution) for _, fitness, solution, _ in collected]
+        self.island_stats = [stats for _, _, _, stats in collected]
+        owner = max(range(self.n_islands), key=lambda k: self.island_results[k][0])
+        self.best_fitness, self.best_solution = self.island_results[owner]
+
+        if self.verbose:
+            for k, (fitness, solution) in enumerate(self.island_results):
+                print(f"岛屿{k}：最优函数值：{fitness}，最优解：{solution.tolist()}")
+            print(f"全局最优函数值：{self.best_fitness}，全局最优解：{self.best_solution.tolist()}")
+        return self.best_fitness, self.best_solution, self.island_results
+
+
+if __name__ == '__main__':
+    values = [2, 6, 5, 7, 8, 9, 4, 6, 8, 11, 7, 10, 5, 4, 5, 8]
+    weights = [3, 4, 2, 5, 6, 7, 4, 5, 6, 9, 7, 8, 5, 4, 5, 6]
+    max_num = [5, 3, 7, 8, 7, 7, 5, 4, 7, 3, 7, 6, 7, 8, 7, 8]
+    model = IslandModel(n_islands=4, migration_interval=20, migrants=5, seed=42,
+                        island_params=[{'selection': 'roulette'}, {'selection': 'tournament'},
+                                       {'selection': 'roulette', 'mutation_rate': 0.5},
+                                       {'selection': 'tournament', 'tournament_size': 4}],
+                        objective_function=ObjectiveFunctions.knapsack_objective_batch, values=values,
+                        constraint=Constraints.knapsack_constraint_batch, weights=weights, max_num=max_num,
+                        max_weight=400, population_size=500, max_iter=200, vectorized=True, verbose=True)
+    model.solve()
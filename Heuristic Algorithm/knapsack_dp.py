@@ -0,0 +1,110 @@
+# -*-coding: Utf-8 -*-
+# @File : knapsack_dp.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+有界背包问题（每种物品最多max_num个）的精确解与上界
+1. knapsack_dp：二进制拆分动态规划，把每种物品的max_num个拆成数量为1, 2, 4, ...的若干组，转化为0-1背包，
+   复杂度为O(sum(log max_num) * max_weight)，每组物品对整个容量数组做一次向量化更新，并记录选择用于还原最优解
+2. knapsack_lp_bound：线性松弛上界，按价值/重量比从高到低装入，最后一种物品可以装入小数个
+二者都只适用于线性目标（总价值）与单一重量约束，也就是ObjectiveFunctions.knapsack_objective与Constraints.knapsack_constraint
+"""
+
+import numpy as np
+from samples import ObjectiveFunctions, Constraints
+
+
+def binary_split(max_num):
+    """把数量上限m拆成1, 2, 4, ..., 余数，这些组的子集之和恰好覆盖0到m"""
+    counts = []
+    k = 1
+    while max_num > 0:
+        counts.append(min(k, max_num))
+        max_num -= counts[-1]
+        k *= 2
+    return counts
+
+
+def knapsack_dp(values, weights, max_num, max_weight):
+    """
+    有界背包问题的精确解
+    :param values: 物品的价值列表
+    :param weights: 物品的重量列表，需为非负整数
+    :param max_num: 物品的数量上限列表
+    :param max_weight: 背包的最大重量，需为非负整数
+    :return: 最优的总价值，以及每种物品的数量列表
+    """
+    weights = np.asarray(weights)
+    if not np.issubdtype(weights.dtype, np.integer) or np.any(weights < 0):
+        raise ValueError(f"动态规划要求物品重量为非负整数")
+    if int(max_weight) != max_weight or max_weight < 0:
+        raise ValueError(f"动态规划要求背包的最大重量为非负整数")
+    max_weight = int(max_weight)
+
+    groups = [(i, c) for i in range(len(values)) for c in binary_split(int(max_num[i]))]
+    best = np.zeros(max_weight + 1)  # best[w]为重量不超过w时的最大价值
+    taken = np.zeros((len(groups), max_weight + 1), dtype=bool)
+
+    for k, (i, c) in enumerate(groups):
+        w, v = int(weights[i]) * c, values[i] * c
+        if w > max_weight:
+            continue
+        candidate = best[:max_weight + 1 - w] + v
+        take = candidate > best[w:]
+        taken[k, w:] = take
+        best[w:] = np.where(take, candidate, best[w:])
+
+    # 从最后一组物品倒推，还原每种物品的数量
+    quantities = [0] * len(values)
+    capacity = max_weight
+    for k in range(len(groups) - 1, -1, -1):
+        if taken[k, capacity]:
+            i, c = groups[k]
+            quantities[i] += c
+            capacity -= int(weights[i]) * c
+    return float(best[max_weight]), quantities
+
+
+def knapsack_lp_bound(values, weights, max_num, max_weight):
+    """
+    有界背包问题的线性松弛上界：按价值/重量比从高到低装入物品，最后一种装不下的物品按比例装入
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    max_num = np.asarray(max_num, dtype=float)
+
+    # 重量为0的物品不占容量，全部装入
+    bound = float(np.sum(np.maximum(values, 0)[weights <= 0] * max_num[weights <= 0]))
+    capacity = float(max_weight)
+    positive = np.flatnonzero((weights > 0) & (values > 0))
+    for i in positive[np.argsort(-values[positive] / weights[positive], kind='stable')]:
+        amount = min(max_num[i], capacity / weights[i])
+        bound += amount * values[i]
+        capacity -= amount * weights[i]
+        if capacity <= 0:
+            break
+    return bound
+
+
+if __name__ == '__main__':
+    import time
+    from SMA_for_knapsack import SMAforknapsack
+
+    values = [2, 6, 5, 7, 8, 9, 4, 6, 8, 11, 7, 10, 5, 4, 5, 8]
+    weights = [3, 4, 2, 5, 6, 7, 4, 5, 6, 9, 7, 8, 5, 4, 5, 6]
+    max_num = [5, 3, 7, 8, 7, 7, 5, 4, 7, 3, 7, 6, 7, 8, 7, 8]
+    max_weight = 400
+
+    start = time.perf_counter()
+    best_value, quantities = knapsack_dp(values, weights, max_num, max_weight)
+    print(f"动态规划：最优的目标函数值为：{best_value}，最优解为：{quantities}，耗时：{time.perf_counter() - start:.4f}秒")
+    print(f"线性松弛上界：{knapsack_lp_bound(values, weights, max_num, max_weight)}")
+
+    start = time.perf_counter()
+    sma = SMAforknapsack(objective_function=ObjectiveFunctions.knapsack_objective_batch, values=values,
+                         constraint=Constraints.knapsack_constraint_batch, weights=weights, max_num=max_num,
+                         max_weight=max_weight, vectorized=True, seed=42, upper_bound='dp', target_gap=0.0)
+    best_fitness, best_solution = sma.solve()
+    print(f"遗传算法：最优的目标函数值为：{best_fitness}，迭代轮数：{sma.iter}，耗时：{time.perf_counter() - start:.4f}秒")
@@ -0,0 +1,131 @@
+# -*-coding: Utf-8 -*-
+# @File : parallel_annealing.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+模拟退火多进程并行链
+1. 同时运行n_chains条相互独立的退火链，每条链使用不同的随机数种子，可单独设置冷却参数
+2. 每隔exchange_interval个温度层级交换一次全局最优解：将全局最优解注入其他各条链，替换其最差的候选解
+3. 返回全局最优解以及每条链的搜索轨迹
+注意：退火链需要在进程间传递，目标函数与约束条件必须可以被pickle（模块级函数或functools.partial，不能是lambda）
+"""
+
+import importlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from samples import ObjectiveFunctions, Constraints
+
+# 文件名中含有空格，只能通过importlib导入
+SimulatedAnnealing = importlib.import_module("Simulated Annealing").SimulatedAnnealing
+
+
+def run_chain_segment(chain, steps):
+    """
+    在子进程中将一条退火链推进steps个温度层级，返回推进后的退火链
+    """
+    for _ in range(steps):
+        if chain.finished():
+            break
+        chain.step()
+    return chain
+
+
+class ParallelAnnealing:
+    def __init__(self, n_chains=4, exchange_interval=10, max_workers=None, seed=None, chain_params=None,
+                 verbose=False, telemetry=None, **kwargs):
+        """
+        :param n_chains: 退火链的数量
+        :param exchange_interval: 每隔多少个温度层级交换一次全局最优解
+        :param max_workers: 进程池的进程数，默认为CPU核数
+        :param seed: 随机数种子，各条链的种子由它派生
+        :param chain_params: 列表，每个元素是一个字典，用于单独覆盖对应退火链的参数（如cooling_rate、temperature）
+        :param verbose: 是否在每次交换后打印全局最优解，默认不打印
+        :param telemetry: Telemetry实例，每次交换后记录一次全局指标；退火链在子进程中运行，不单独记录
+        :param kwargs: 其余参数原样传给每条SimulatedAnnealing退火链
+        """
+        if not isinstance(n_chains, int) or n_chains < 1:
+            raise ValueError(f"请输入正确的n_chains")
+
+        if not isinstance(exchange_interval, int) or exchange_interval < 1:
+            raise ValueError(f"请输入正确的exchange_interval")
+
+        if chain_params is None:
+            chain_params = [{} for _ in range(n_chains)]
+        if len(chain_params) != n_chains:
+            raise ValueError(f"chain_params的长度为{len(chain_params)}，与退火链数量{n_chains}不一致")
+
+        self.n_chains = n_chains
+        self.exchange_interval = exchange_interval
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.telemetry = telemetry
+
+        # 由同一个种子派生出互不相关的子种子，保证各条链独立且整体可复现
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(n_chains)]
+        self.chains = [SimulatedAnnealing(**{**kwargs, 'verbose': False, 'telemetry': None, 'seed': seeds[k], **chain_params[k]})
+                       for k in range(n_chains)]
+
+        self.best_fitness = None
+        self.best_solution = None
+        self.update_best()
+
+    def update_best(self):
+        """从各条链中找出全局最优解，返回其所在链的下标"""
+        owner = min(range(self.n_chains), key=lambda k: self.chains[k].best_fitness)
+        self.best_fitness = self.chains[owner].best_fitness
+        self.best_solution = self.chains[owner].copy_solution(self.chains[owner].best_solution)
+        return owner
+
+    def exchange(self):
+        """将全局最优解注入其他尚未结束的退火链"""
+        owner = self.update_best()
+        for k, chain in enumerate(self.chains):
+            if k != owner and not chain.finished():
+                chain.inject(self.best_solution, self.best_fitness)
+
+    @property
+    def traces(self):
+        """每条链在各个温度层级下的最优函数值"""
+        return [chain.fitness_history for chain in self.chains]
+
+    def solve(self):
+        """
+        并行退火主函数入口
+        :return: 全局最优函数值、全局最优解、每条链的搜索轨迹
+        """
+        rounds = 0
+        phase_start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while not all(chain.finished() for chain in self.chains):
+                self.chains = list(executor.map(run_chain_segment, self.chains,
+                                                [self.exchange_interval] * self.n_chains))
+                self.exchange()
+                rounds += 1
+                if self.verbose:
+                    print(f'第{rounds}次交换，全局最优函数值：{self.best_fitness}，'
+                          f'各链当前温度：{[round(chain.temperature, 4) for chain in self.chains]}')
+                if self.telemetry is not None:
+                    self.telemetry.record(self.__class__.__name__, 'exchange', step=rounds,
+                                          best_fitness=self.best_fitness,
+                                          evaluations=sum(chain.stats['evaluations'] for chain in self.chains),
+                                          phase_time=time.perf_counter() - phase_start)
+                phase_start = time.perf_counter()
+
+        self.update_best()
+        return self.best_fitness, self.best_solution, self.traces
+
+
+if __name__ == '__main__':
+    from functools import partial
+
+    pa = ParallelAnnealing(n_chains=4, exchange_interval=20, seed=42,
+                           chain_params=[{'cooling_rate': r} for r in [0.95, 0.97, 0.98, 0.99]],
+                           objective_function=ObjectiveFunctions.rosenbrock_function_batch,
+                           constraint=partial(Constraints.box_constraint_batch, lower=-5, upper=5),
+                           x_num=10, minx=-5, maxx=5, vectorized=True, coefficient=0.01, verbose=True)
+    best_fitness, best_solution, traces = pa.solve()
+    print(f"全局最优函数值：{best_fitness}")
+    print(f"全局最优解：{best_solution}")
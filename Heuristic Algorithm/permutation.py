@@ -0,0 +1,177 @@
+# -*-coding: Utf-8 -*-
+# @File : permutation.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+排列编码的移动算子，用于TSP、VRP路线等以访问顺序表示的解
+解为城市编号的列表tour，视为一个闭合回路（最后一个城市回到第一个城市），位置下标按回路取模
+每个移动算子提供三个方法：
+1. sample(tour, rng)：随机生成一个移动，只包含几个下标，不复制回路
+2. delta(tour, dist, move)：根据距离矩阵计算执行移动后回路长度的变化量，只涉及被改动的几条边，复杂度为O(1)
+3. apply(tour, move)：接受移动时原地修改回路
+算子：
+1. SwapMove：交换两个位置上的城市
+2. InsertMove：把一个城市移到另一个位置之后
+3. TwoOptMove：反转一段路径（2-opt），要求距离矩阵对称
+4. OrOptMove：把一段长度为1~3的连续路径整体移到另一个位置之后（Or-opt）
+"""
+
+import random
+import math
+
+
+def edge_sum(tour, dist, positions):
+    """位置集合positions上各条边(tour[p], tour[p+1])的长度之和"""
+    n = len(tour)
+    return sum(dist[tour[p % n]][tour[(p + 1) % n]] for p in positions)
+
+
+class SwapMove:
+    """交换位置i与j上的城市，move为(i, j)"""
+
+    @staticmethod
+    def sample(tour, rng):
+        i, j = rng.sample(range(len(tour)), 2)
+        return min(i, j), max(i, j)
+
+    @staticmethod
+    def delta(tour, dist, move):
+        i, j = move
+        n = len(tour)
+        # 受影响的边为i、j两侧的边，i与j相邻时去重
+        positions = {(i - 1) % n, i, (j - 1) % n, j}
+        before = edge_sum(tour, dist, positions)
+        tour[i], tour[j] = tour[j], tour[i]
+        after = edge_sum(tour, dist, positions)
+        tour[i], tour[j] = tour[j], tour[i]
+        return after - before
+
+    @staticmethod
+    def apply(tour, move):
+        i, j = move
+        tour[i], tour[j] = tour[j], tour[i]
+
+
+class InsertMove:
+    """把位置i上的城市移出，插入到原回路中位置j的城市之后，move为(i, j)"""
+
+    @staticmethod
+    def sample(tour, rng):
+        n = len(tour)
+        i = rng.randrange(n)
+        j = (i + 1 + rng.randrange(n - 2)) % n  # j不能是i或i-1，否则回路不变
+        return i, j
+
+    @staticmethod
+    def delta(tour, dist, move):
+        i, j = move
+        n = len(tour)
+        a, c, b = tour[(i - 1) % n], tour[i], tour[(i + 1) % n]
+        p, q = tour[j], tour[(j + 1) % n]
+        return dist[a][b] - dist[a][c] - dist[c][b] + dist[p][c] + dist[c][q] - dist[p][q]
+
+    @staticmethod
+    def apply(tour, move):
+        i, j = move
+        city = tour.pop(i)
+        tour.insert(j + 1 if j < i else j, city)
+
+
+class TwoOptMove:
+    """反转位置i到j（i < j）之间的路径，move为(i, j)；反转路径后边的方向改变，因此要求距离矩阵对称"""
+
+    @staticmethod
+    def sample(tour, rng):
+        n = len(tour)
+        while True:
+            i, j = sorted(rng.sample(range(n), 2))
+            if j - i < n - 1:  # 反转整条回路不改变回路
+                return i, j
+
+    @staticmethod
+    def delta(tour, dist, move):
+        i, j = move
+        n = len(tour)
+        a, b = tour[(i - 1) % n], tour[i]
+        c, d = tour[j], tour[(j + 1) % n]
+        return dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+
+    @staticmethod
+    def apply(tour, move):
+        i, j = move
+        tour[i:j + 1] = tour[i:j + 1][::-1]
+
+
+class OrOptMove:
+    """把从位置i开始、长度为k的路径段（不跨越回路末尾）移到原回路中位置j的城市之后，move为(i, k, j)"""
+
+    max_length = 3
+
+    @staticmethod
+    def sample(tour, rng):
+        n = len(tour)
+        k = rng.randint(1, max(1, min(OrOptMove.max_length, n - 3)))
+        i = rng.randrange(n - k + 1)
+        j = (i + k + rng.randrange(n - k - 1)) % n  # j不能落在路径段及其前一个位置上
+        return i, k, j
+
+    @staticmethod
+    def delta(tour, dist, move):
+        i, k, j = move
+        n = len(tour)
+        a, s = tour[(i - 1) % n], tour[i]
+        e, b = tour[i + k - 1], tour[(i + k) % n]
+        p, q = tour[j], tour[(j + 1) % n]
+        return dist[a][b] - dist[a][s] - dist[e][b] + dist[p][s] + dist[e][q] - dist[p][q]
+
+    @staticmethod
+    def apply(tour, move):
+        i, k, j = move
+        segment = tour[i:i + k]
+        del tour[i:i + k]
+        position = j + 1 if j < i else j - k + 1
+        tour[position:position] = segment
+
+
+# 内置移动算子，SimulatedAnnealing的permutation_moves参数可直接使用这些名称
+PERMUTATION_MOVES = {
+    'swap': SwapMove,
+    'insert': InsertMove,
+    'two_opt': TwoOptMove,
+    'or_opt': OrOptMove
+}
+
+
+def random_tour(n, rng=random):
+    """随机生成一个长度为n的排列"""
+    tour = list(range(n))
+    rng.shuffle(tour)
+    return tour
+
+
+def distance_matrix(locations):
+    """根据城市坐标计算欧氏距离矩阵"""
+    return [[math.dist(p, q) for q in locations] for p in locations]
+
+
+if __name__ == '__main__':
+    import importlib
+    from functools import partial
+    from samples import ObjectiveFunctions
+
+    SimulatedAnnealing = importlib.import_module("Simulated Annealing").SimulatedAnnealing
+
+    # 与第4章穷举法求解TSP相同的随机城市，城市数量增加到30个，穷举法已经无法求解
+    random.seed(42)
+    city_num = 30
+    city_loc = [(random.randint(1, 100), random.randint(1, 100)) for _ in range(city_num)]
+    dis_matrix = distance_matrix(city_loc)
+
+    sa = SimulatedAnnealing(objective_function=partial(ObjectiveFunctions.tour_length, dist_matrix=dis_matrix),
+                            permutation=True, distance_matrix=dis_matrix, x_num=city_num, seed=42,
+                            temperature=100, temperature_end=0.1, cooling_rate=0.98, num_iterations=20)
+    best_fitness, best_solution = sa.solve()
+    print(f"最短路径为：{best_solution}，距离 = {best_fitness}")
+    print(f"增量评估次数：{sa.stats['delta_evaluations']}，完整评估次数：{sa.stats['evaluations']}")
@@ -0,0 +1,96 @@
+# -*-coding: Utf-8 -*-
+# @File : repair.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+修复/投影算子
+生成邻域解时，不满足约束的扰动结果直接修复到可行域内，而不是丢弃后反复重新抽样
+所有算子的输入为ndarray，最后一维为变量维度，既可以是单个解(x_num,)，也可以是候选解集(n_candidates, x_num)
+"""
+
+import numpy as np
+
+
+def clip(x, lower=0, upper=9999):
+    """截断：超出框约束的变量直接取边界值"""
+    return np.clip(x, lower, upper)
+
+
+def reflect(x, lower=0, upper=9999):
+    """反射：超出框约束的部分按边界镜像反射回可行域，比截断更不容易让解堆积在边界上"""
+    x = np.asarray(x)
+    span = upper - lower
+    y = np.mod(x - lower, 2 * span)
+    return lower + np.where(y > span, 2 * span - y, y)
+
+
+def project_l1_ball(x, radius=10):
+    """
+    投影到L1球 {x : sum(|x|) <= radius} 上（对应Constraints.sum_constraint），
+    采用排序阈值法，复杂度为O(x_num log x_num)
+    """
+    x = np.asarray(x, dtype=float)
+    rows = np.atleast_2d(x)
+    a = np.abs(rows)
+    inside = a.sum(axis=-1) <= radius
+    radius = radius * (1 - 1e-12)  # 留出极小的数值余量，保证投影结果在浮点误差下仍满足约束
+
+    u = -np.sort(-a, axis=-1)  # 降序排列
+    css = np.cumsum(u, axis=-1)
+    k = np.arange(1, rows.shape[-1] + 1)
+    cond = u - (css - radius) / k > 0
+    rho = rows.shape[-1] - 1 - np.argmax(cond[:, ::-1], axis=-1)  # 最后一个满足条件的下标
+    theta = (css[np.arange(len(rows)), rho] - radius) / (rho + 1)
+
+    projected = np.sign(rows) * np.maximum(a - theta[:, None], 0)
+    projected = np.where(inside[:, None], rows, projected)
+    return projected.reshape(x.shape)
+
+
+
+def knapsack_greedy_repair(quantities, values, weights, max_num, max_weight):
+    """
+    背包问题的贪心修复：先把数量截断到[0, max_num]，再按价值/重量比从低到高丢弃物品，直到总重量不超过max_weight，
+    最后按价值/重量比从高到低用剩余容量补充物品。物品的排序对所有解相同，只需排序一次，复杂度为O(x_num log x_num)
+    :param quantities: (n, x_num)的整数ndarray，每行是一个解
+    :return: 修复后的ndarray，每行都满足数量上限与重量约束（只要全部物品数量为0时满足重量约束）
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    max_num = np.asarray(max_num)
+    x = np.clip(np.asarray(quantities), 0, max_num)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(weights > 0, values / weights, np.inf)
+    order = np.argsort(ratio, kind='stable')  # 价值/重量比从低到高
+
+    # 丢弃：超重部分依次由比值最低的物品承担，每个物品丢弃刚好够用的数量
+    excess = x @ weights - max_weight
+    xs, ws = x[:, order], weights[order]
+    removed_before = np.cumsum(xs * ws, axis=1) - xs * ws  # 排在前面的物品全部丢弃后减少的重量
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drop = np.where(ws > 0, np.ceil((excess[:, None] - removed_before) / ws), 0)
+    xs = xs - np.clip(drop, 0, xs).astype(x.dtype)
+
+    # 补充：按比值从高到低，用剩余容量尽量多地装入物品
+    slack = max_weight - xs @ ws
+    for k in range(len(order) - 1, -1, -1):
+        if ws[k] <= 0:
+            add = max_num[order[k]] - xs[:, k]
+        else:
+            add = np.clip(np.floor(slack / ws[k]), 0, max_num[order[k]] - xs[:, k]).astype(x.dtype)
+        xs[:, k] += add
+        slack = slack - add * ws[k]
+
+    x[:, order] = xs
+    return x
+
+
+# 内置修复算子，SimulatedAnnealing的repair参数可直接使用这些名称
+REPAIR_OPERATORS = {
+    'clip': clip,
+    'reflect': reflect,
+    'l1_ball': project_l1_ball
+}
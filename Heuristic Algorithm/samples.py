@@ -78,6 +78,110 @@ class ObjectiveFunctions:
             return single_val(x)
         return sum(single_val(xi) for xi in x)
 
+    # ------------------------------------------------------------------
+    # 批量版本：输入形状为(n_candidates, x_num)的ndarray，返回形状为(n_candidates,)的ndarray
+    # 也兼容一维输入(x_num,)，此时返回标量
+    # ------------------------------------------------------------------
+    @staticmethod
+    def knapsack_objective_batch(quantities: np.ndarray, values) -> np.ndarray:
+        """背包问题目标函数的批量版本，一次计算所有候选解的总价值"""
+        return np.asarray(quantities) @ np.asarray(values)
+
+    @staticmethod
+    def sphere_function_batch(x: np.ndarray) -> np.ndarray:
+        """球面函数的批量版本"""
+        x = np.asarray(x)
+        return np.sum(x ** 2, axis=-1)
+
+    @staticmethod
+    def rosenbrock_function_batch(x: np.ndarray) -> np.ndarray:
+        """Rosenbrock函数的批量版本"""
+        x = np.asarray(x)
+        return np.sum(100 * (x[..., 1:] - x[..., :-1] ** 2) ** 2 + (1 - x[..., :-1]) ** 2, axis=-1)
+
+    @staticmethod
+    def absolute_function_batch(x: np.ndarray) -> np.ndarray:
+        """绝对值函数的批量版本"""
+        return np.sum(np.abs(x), axis=-1)
+
+    @staticmethod
+    def step_function_batch(x: np.ndarray) -> np.ndarray:
+        """阶梯函数的批量版本"""
+        return np.sum(np.floor(x), axis=-1)
+
+    @staticmethod
+    def mixed_function_batch(x: np.ndarray) -> np.ndarray:
+        """混合函数的批量版本"""
+        x = np.asarray(x)
+        return np.sum(np.abs(x) + np.floor(x / 2) + (x ** 2) / 2, axis=-1)
+
+    @staticmethod
+    def piecewise_function_batch(x: np.ndarray) -> np.ndarray:
+        """分段函数的批量版本"""
+        x = np.asarray(x)
+        piece = np.where(x < -1, x ** 2, np.where(x < 1, np.abs(x), x ** 2 + 1))
+        return np.sum(piece, axis=-1)
+
+    @staticmethod
+    def discontinuous_periodic_batch(x: np.ndarray) -> np.ndarray:
+        """不连续周期函数的批量版本"""
+        x = np.asarray(x)
+        return np.sum(np.ceil(np.sin(x)) + np.abs(x), axis=-1)
+
+    # ------------------------------------------------------------------
+    # 增量版本：move为(idx, new_values)，表示将x[idx]改为new_values，返回函数值的变化量
+    # 只适用于可分离的目标函数，计算量只与被修改的变量个数有关
+    # ------------------------------------------------------------------
+    @staticmethod
+    def knapsack_delta(quantities, move, values):
+        """背包问题目标函数的增量版本"""
+        return sum(values[i] * (v - quantities[i]) for i, v in zip(*move))
+
+    @staticmethod
+    def sphere_delta(x: List[float], move) -> float:
+        """球面函数的增量版本"""
+        return sum(v ** 2 - x[i] ** 2 for i, v in zip(*move))
+
+    @staticmethod
+    def absolute_delta(x: List[float], move) -> float:
+        """绝对值函数的增量版本"""
+        return sum(abs(v) - abs(x[i]) for i, v in zip(*move))
+
+    @staticmethod
+    def knapsack_delta_batch(quantities: np.ndarray, move, values) -> np.ndarray:
+        """背包问题目标函数的批量增量版本，idx与new_values均为(n_candidates, k)的ndarray"""
+        idx, new_values = move
+        old_values = np.take_along_axis(quantities, idx, axis=1)
+        return np.sum(np.asarray(values)[idx] * (new_values - old_values), axis=1)
+
+    @staticmethod
+    def sphere_delta_batch(x: np.ndarray, move) -> np.ndarray:
+        """球面函数的批量增量版本"""
+        idx, new_values = move
+        old_values = np.take_along_axis(x, idx, axis=1)
+        return np.sum(new_values ** 2 - old_values ** 2, axis=1)
+
+    @staticmethod
+    def absolute_delta_batch(x: np.ndarray, move) -> np.ndarray:
+        """绝对值函数的批量增量版本"""
+        idx, new_values = move
+        old_values = np.take_along_axis(x, idx, axis=1)
+        return np.sum(np.abs(new_values) - np.abs(old_values), axis=1)
+
+    # ------------------------------------------------------------------
+    # 排列编码：x为城市的访问顺序，增量计算见permutation.py中的移动算子
+    # ------------------------------------------------------------------
+    @staticmethod
+    def tour_length(x: List[int], dist_matrix) -> float:
+        """TSP回路长度，包括从最后一个城市返回第一个城市的距离"""
+        return sum(dist_matrix[x[i - 1]][x[i]] for i in range(len(x)))
+
+    @staticmethod
+    def tour_length_batch(x: np.ndarray, dist_matrix) -> np.ndarray:
+        """TSP回路长度的批量版本，x为(n_candidates, n_cities)的ndarray"""
+        x = np.asarray(x)
+        return np.sum(np.asarray(dist_matrix)[np.roll(x, 1, axis=-1), x], axis=-1)
+
 
 class Constraints:
     """约束条件集合"""
@@ -171,6 +275,121 @@ class Constraints:
             return True
         return all((x[i] * x[i + 1]) <= 0 for i in range(len(x) - 1))
 
+    # ------------------------------------------------------------------
+    # 批量版本：输入形状为(n_candidates, x_num)的ndarray，返回形状为(n_candidates,)的布尔ndarray
+    # ------------------------------------------------------------------
+    @staticmethod
+    def knapsack_constraint_batch(quantities: np.ndarray, weights, max_num, max_weight: float) -> np.ndarray:
+        """背包约束的批量版本，同时检查物品数量上限和总重量"""
+        quantities = np.asarray(quantities)
+        if quantities.shape[-1] != len(weights) or quantities.shape[-1] != len(max_num):
+            raise ValueError(f"背包问题中，自变量列表元素个数为{quantities.shape[-1]}，重量列表的元素个数为{len(weights)}，不一致")
+        within_num = np.all(quantities <= np.asarray(max_num), axis=-1)
+        return within_num & (quantities @ np.asarray(weights) <= max_weight)
+
+    @staticmethod
+    def box_constraint_batch(x: np.ndarray, lower=0, upper=9999) -> np.ndarray:
+        """框约束的批量版本"""
+        x = np.asarray(x)
+        return np.all((x >= lower) & (x <= upper), axis=-1)
+
+    @staticmethod
+    def integer_constraint_batch(x: np.ndarray) -> np.ndarray:
+        """整数约束的批量版本"""
+        x = np.asarray(x)
+        return np.all(np.abs(x - np.round(x)) < 1e-6, axis=-1)
+
+    @staticmethod
+    def binary_constraint_batch(x: np.ndarray) -> np.ndarray:
+        """二值约束的批量版本"""
+        x = np.asarray(x)
+        return np.all((x == 0) | (x == 1), axis=-1)
+
+    @staticmethod
+    def modulo_constraint_batch(x: np.ndarray, mod_val: int = 3) -> np.ndarray:
+        """模约束的批量版本"""
+        return np.all(np.asarray(x) % mod_val == 0, axis=-1)
+
+    @staticmethod
+    def piecewise_constraint_batch(x: np.ndarray) -> np.ndarray:
+        """分段约束的批量版本"""
+        x = np.asarray(x)
+        return np.all(np.where(x < 0, x >= -5, x <= 3), axis=-1)
+
+    @staticmethod
+    def periodic_constraint_batch(x: np.ndarray) -> np.ndarray:
+        """周期性约束的批量版本"""
+        return np.all(np.sin(x) >= 0, axis=-1)
+
+    @staticmethod
+    def sum_constraint_batch(x: np.ndarray, threshold: float = 10) -> np.ndarray:
+        """和约束的批量版本"""
+        return np.sum(np.abs(x), axis=-1) <= threshold
+
+    @staticmethod
+    def alternating_constraint_batch(x: np.ndarray) -> np.ndarray:
+        """交替约束的批量版本"""
+        x = np.asarray(x)
+        return np.all(x[..., :-1] * x[..., 1:] <= 0, axis=-1)
+
+
+class FeasibleIntervals:
+    """
+    约束条件对应的可行扰动区间
+    输入当前解x（ndarray，最后一维为变量维度），返回与x形状相同的(lo, hi)，
+    当前解可行时，每个变量在[lo, hi]内任意取值（所有变量可同时变化）得到的解仍满足对应约束，
+    因此邻域解只需在该区间内抽样，无需反复调用约束条件做拒绝抽样
+    """
+
+    @staticmethod
+    def box_interval(x: np.ndarray, lower=0, upper=9999):
+        """框约束：区间就是框本身"""
+        x = np.asarray(x)
+        return np.full(x.shape, lower, dtype=float), np.full(x.shape, upper, dtype=float)
+
+    @staticmethod
+    def piecewise_interval(x: np.ndarray):
+        """分段约束：负数部分不小于-5，非负部分不大于3，合起来即[-5, 3]"""
+        return FeasibleIntervals.box_interval(x, -5, 3)
+
+    @staticmethod
+    def periodic_interval(x: np.ndarray):
+        """周期性约束sin(x) >= 0：取当前值所在的区间[2kπ, (2k+1)π]"""
+        x = np.asarray(x, dtype=float)
+        lo = np.floor(x / (2 * np.pi)) * 2 * np.pi
+        return lo, lo + np.pi
+
+    @staticmethod
+    def sum_interval(x: np.ndarray, threshold: float = 10):
+        """
+        和约束sum(|x|) <= threshold：把剩余的松弛量平均分给每个变量，
+        即|x_i'| <= |x_i| + (threshold - sum(|x|)) / x_num，所有变量同时取值也不会超出阈值
+        """
+        x = np.asarray(x, dtype=float)
+        slack = np.maximum(threshold - np.sum(np.abs(x), axis=-1, keepdims=True), 0)
+        bound = np.abs(x) + slack / x.shape[-1]
+        return -bound, bound
+
+    @staticmethod
+    def alternating_interval(x: np.ndarray):
+        """交替约束：保持每个变量的符号不变（正数不小于0，负数不大于0，0保持为0）"""
+        x = np.asarray(x, dtype=float)
+        lo = np.where(x > 0, 0, np.where(x < 0, -np.inf, 0))
+        hi = np.where(x < 0, 0, np.where(x > 0, np.inf, 0))
+        return lo, hi
+
+    @staticmethod
+    def knapsack_interval(quantities: np.ndarray, weights, max_num, max_weight: float):
+        """
+        背包约束：剩余容量平均分给每个物品，
+        第i个物品的数量可在[0, min(max_num_i, q_i + 剩余容量 / (n_items * w_i))]之间变化
+        """
+        quantities = np.asarray(quantities, dtype=float)
+        weights = np.asarray(weights, dtype=float)
+        slack = np.maximum(max_weight - quantities @ weights, 0)
+        hi = np.minimum(np.asarray(max_num), quantities + np.floor(np.expand_dims(slack, -1) / (quantities.shape[-1] * weights)))
+        return np.zeros_like(quantities), hi
+
 
 def test_functions():
     """测试函数示例"""
@@ -192,6 +411,11 @@ def test_functions():
     print(f"周期性约束检查: {cons.periodic_constraint(x2)}")
     print(f"交替约束检查: {cons.alternating_constraint(x2)}")
 
+    # 测试批量版本：每一行是一个候选解
+    x3 = np.array([x1, [0.5, 1.2, -3.1]])
+    print(f"批量分段函数值: {obj.piecewise_function_batch(x3)}")
+    print(f"批量分段约束检查: {cons.piecewise_constraint_batch(x3)}")
+
 
 if __name__ == "__main__":
     test_functions()
\ No newline at end of file
@@ -0,0 +1,123 @@
+# -*-coding: Utf-8 -*-
+# @File : surrogate.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+代理模型辅助搜索
+目标函数是一次需要数秒的仿真时，每次生成多组候选解（邻域解/子代），先用代理模型预测其函数值，
+只把预测最好的候选解交给真实目标函数评估，并用新的真实评估结果在线更新代理模型
+1. RBFSurrogate：径向基函数插值模型（带线性多项式项），只依赖numpy，保留最近max_points个真实评估点，
+   输入与输出在拟合前标准化
+2. 求解器的surrogate参数传入RBFSurrogate实例后启用，surrogate_candidates为每个位置生成的候选解个数，
+   max_evaluations为真实评估次数的预算，stats['surrogate_avoided']记录被代理模型筛掉、因而省去的真实评估次数
+"""
+
+import numpy as np
+
+
+class RBFSurrogate:
+    def __init__(self, kernel='cubic', epsilon=1.0, max_points=300, min_points=None, ridge=1e-8):
+        """
+        :param kernel: 径向基函数，可选'cubic'（r^3）、'thin_plate'（r^2 log r）、'gaussian'、'multiquadric'
+        :param epsilon: 'gaussian'与'multiquadric'的形状参数
+        :param max_points: 保留的真实评估点个数上限，超出后丢弃最早的点，拟合复杂度为O(max_points^3)
+        :param min_points: 开始使用代理模型所需的最少评估点个数，默认为2 * 变量个数 + 2
+        :param ridge: 插值矩阵对角线上的正则项，避免点过于接近时矩阵奇异
+        """
+        if kernel not in ['cubic', 'thin_plate', 'gaussian', 'multiquadric']:
+            raise ValueError(f"请输入正确的kernel")
+        self.kernel = kernel
+        self.epsilon = epsilon
+        self.max_points = max_points
+        self.min_points = min_points
+        self.ridge = ridge
+
+        self.X = None
+        self.y = None
+        self.keys = {}  # 已有评估点的字节串，重复的点不再加入
+        self.model = None
+
+    def basis(self, r):
+        """径向基函数"""
+        if self.kernel == 'cubic':
+            return r ** 3
+        if self.kernel == 'thin_plate':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(r > 0, r ** 2 * np.log(r), 0.0)
+        if self.kernel == 'gaussian':
+            return np.exp(-(self.epsilon * r) ** 2)
+        return np.sqrt(1 + (self.epsilon * r) ** 2)
+
+    @staticmethod
+    def distance(a, b):
+        """两组点之间的欧氏距离矩阵"""
+        sq = np.sum(a ** 2, axis=1)[:, None] + np.sum(b ** 2, axis=1)[None, :] - 2 * a @ b.T
+        return np.sqrt(np.maximum(sq, 0))
+
+    @property
+    def n_points(self):
+        return 0 if self.X is None else len(self.X)
+
+    def ready(self, dim):
+        """评估点足够多时才使用代理模型"""
+        min_points = self.min_points if self.min_points is not None else 2 * dim + 2
+        return self.n_points >= min_points
+
+    def add(self, X, y):
+        """
+        加入新的真实评估结果，跳过重复的点以及函数值不是有限数的点
+        :param X: (n, x_num)的ndarray
+        :param y: (n,)的函数值
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.asarray(y, dtype=float).ravel()
+        rows = []
+        for k in np.flatnonzero(np.isfinite(y)):
+            key = X[k].tobytes()
+            if key not in self.keys:
+                self.keys[key] = True
+                rows.append(k)
+        if not rows:
+            return
+
+        self.X = X[rows] if self.X is None else np.concatenate([self.X, X[rows]])
+        self.y = y[rows] if self.y is None else np.concatenate([self.y, y[rows]])
+        if len(self.X) > self.max_points:
+            for row in self.X[:-self.max_points]:
+                self.keys.pop(row.tobytes(), None)
+            self.X, self.y = self.X[-self.max_points:], self.y[-self.max_points:]
+        self.model = None
+
+    def fit(self):
+        """求解插值方程组 [Phi P; P^T 0][w; c] = [y; 0]"""
+        mean, std = self.X.mean(axis=0), self.X.std(axis=0) + 1e-12
+        y_mean, y_std = self.y.mean(), self.y.std() + 1e-12
+        Z = (self.X - mean) / std
+        n, d = Z.shape
+
+        P = np.hstack([np.ones((n, 1)), Z])
+        A = np.zeros((n + d + 1, n + d + 1))
+        A[:n, :n] = self.basis(self.distance(Z, Z)) + self.ridge * np.eye(n)
+        A[:n, n:] = P
+        A[n:, :n] = P.T
+        b = np.concatenate([(self.y - y_mean) / y_std, np.zeros(d + 1)])
+        try:
+            coef = np.linalg.solve(A, b)
+        except np.linalg.LinAlgError:
+            coef = np.linalg.lstsq(A, b, rcond=None)[0]
+        self.model = (Z, mean, std, y_mean, y_std, coef[:n], coef[n:])
+
+    def predict(self, X):
+        """
+        预测一组点的函数值
+        :param X: (n, x_num)的ndarray
+        :return: (n,)的ndarray
+        """
+        if self.model is None:
+            self.fit()
+        Z, mean, std, y_mean, y_std, weights, poly = self.model
+        Q = (np.atleast_2d(np.asarray(X, dtype=float)) - mean) / std
+        values = self.basis(self.distance(Q, Z)) @ weights + poly[0] + Q @ poly[1:]
+        return y_mean + y_std * values
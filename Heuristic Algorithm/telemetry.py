@@ -0,0 +1,71 @@
+# -*-coding: Utf-8 -*-
+# @File : telemetry.py
+# author: 薛煜殿
+# email: xue_yu_dian@163.com
+# Time：2026/10/18
+
+"""
+启发式算法的运行记录
+求解器每完成一个阶段（模拟退火的一个温度层级、遗传算法的一代）调用一次record，
+记录评估次数、约束调用次数、接受率、历史最优值、阶段耗时等指标，保存在固定容量的环形缓冲区中，
+可以导出为JSONL或CSV文件，也可以注册回调函数实时处理每条记录
+求解器的telemetry参数默认为None，此时不做任何记录，也不打印
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+
+class Telemetry:
+    def __init__(self, capacity=10000, callbacks=None):
+        """
+        :param capacity: 环形缓冲区的容量，超出后丢弃最早的记录
+        :param callbacks: 回调函数列表，每条记录生成后依次调用 callback(record)
+        """
+        self.records = deque(maxlen=capacity)
+        self.callbacks = list(callbacks or [])
+        self.start_time = time.perf_counter()
+
+    def record(self, source, phase, **metrics):
+        """
+        记录一个阶段的指标
+        :param source: 求解器名称
+        :param phase: 阶段名称，如'temperature'、'generation'
+        :param metrics: 指标，值需为数字、字符串等可以写入JSON的类型
+        """
+        record = {'source': source, 'phase': phase, 'elapsed': time.perf_counter() - self.start_time, **metrics}
+        self.records.append(record)
+        for callback in self.callbacks:
+            callback(record)
+        return record
+
+    def clear(self):
+        """清空记录并重新计时"""
+        self.records.clear()
+        self.start_time = time.perf_counter()
+
+    def to_jsonl(self, path):
+        """导出为JSONL文件，每行一条记录"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False, default=float) + '\n')
+
+    def to_csv(self, path):
+        """导出为CSV文件，表头为所有记录中出现过的指标"""
+        fieldnames = []
+        for record in self.records:
+            for key in record:
+                if key not in fieldnames:
+                    fieldnames.append(key)
+
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+
+def print_callback(record):
+    """打印每条记录的回调函数"""
+    print('，'.join(f'{key}：{value}' for key, value in record.items()))
@@ -7,7 +7,7 @@
 
 import torch
 import numpy as np
-from typing import Dict, Callable, Optional, Union
+from typing import Dict, Callable, Optional, Union, List
 
 
 class GradientModifier:
@@ -15,13 +15,65 @@ class GradientModifier:
     梯度修改工具类，支持多种梯度调整策略以优化训练效果
     支持：梯度裁剪、阈值过滤、缩放、稀疏化、平滑、不可导函数梯度替换
     已修复：非叶子张量梯度保留警告、梯度调用参数不匹配问题
+    快速模式（fast=True）：每种变换用torch._foreach_*对全部梯度一次完成，不打印、不调用.item()，
+    不会触发设备同步，也不会在torch.compile中造成图中断；统计信息只在collect_stats=True时以设备张量的形式记录，
+    调用report_stats()时才一次性同步
+    融合流水线：快速模式下apply()按参数组分别配置策略。compile=False（默认）时逐个策略调用*_foreach方法，
+    每种策略对整组梯度只启动约一次多张量内核，但每种策略都要读写一遍梯度；compile=True时把策略链预编译为逐张量函数，
+    由torch.compile融合为每个张量一个内核，只读写一遍梯度，代价是首次调用的编译时间以及每个张量一次内核启动；
+    collect_stats=True时总是使用*_foreach方法，以便记录每种策略的统计信息
+    平滑状态：每个参数组的历史梯度保存在预分配的扁平缓冲区中，每个参数对应其中的一个视图，用lerp_原地更新；
+    参数组的参数发生变化（如重建模块）时重新分配，通过state_dict()/load_state_dict()保存与恢复
     """
 
-    def __init__(self):
+    # 融合流水线中逐张量执行的策略；clip_by_norm需要全局范数，总是在流水线之前先由clip_grad_norm_完成
+    FUSED_STRATEGIES = ("clip_by_value", "filter_small_grads", "scale_grads", "apply_sparsity", "smooth_grads")
+    # apply()支持的全部策略，快速模式与普通模式共用
+    STRATEGIES = ("clip_by_norm",) + FUSED_STRATEGIES + ("replace_undef_func_grads",)
+
+    def __init__(self, fast: bool = False, collect_stats: bool = False, compile: bool = False):
         # 不可导函数梯度替换规则：{函数标识: 梯度替换函数}
         self.undef_func_grad_rules: Dict[str, Callable] = {}
         # 需要特殊处理的张量（自动为非叶子张量启用retain_grad）
         self.special_tensors = set()
+        # 快速模式与延迟统计：[(策略名, {统计项: 设备上的张量})]
+        self.fast = fast
+        self.collect_stats = collect_stats
+        self.pending_stats: List[tuple] = []
+        # 按策略配置缓存的融合流水线
+        self.compile = compile
+        self.pipelines: Dict[str, Callable] = {}
+        # 平滑状态：{参数组下标: {"layout": 参数布局, "shapes": 形状列表, "buffers": 扁平缓冲区列表, "views": 每个参数的视图}}
+        self.smooth_states: Dict[int, Dict] = {}
+
+    def log(self, message: str):
+        """快速模式下不打印"""
+        if not self.fast:
+            print(message)
+
+    @staticmethod
+    def collect_grads(parameters) -> List[torch.Tensor]:
+        """取出所有非None的梯度张量（parameters可以是生成器）"""
+        return [p.grad for p in parameters if p.grad is not None]
+
+    def record_stats(self, strategy: str, **stats):
+        """记录一组设备上的统计张量，不做同步"""
+        self.pending_stats.append((strategy, stats))
+
+    def report_stats(self, clear: bool = True) -> List[Dict]:
+        """
+        同步并取出快速模式记录的统计信息，每个张量只在这里转换一次
+        :return: [{"strategy": 策略名, 统计项: 每个参数的数值列表}]
+        """
+        report = []
+        for strategy, stats in self.pending_stats:
+            entry = {"strategy": strategy}
+            for key, value in stats.items():
+                entry[key] = value.tolist()
+            report.append(entry)
+        if clear:
+            self.pending_stats = []
+        return report
 
     def register_undef_func_rule(self, func_name: str, grad_func: Callable):
         """注册不可导函数的梯度替换规则"""
@@ -36,13 +88,67 @@ class GradientModifier:
         self.special_tensors.add(tensor)
         print(f"✅ 已注册特殊张量：{tensor_name}，形状={tensor.shape}，是否叶子张量={tensor.is_leaf}")
 
+    @staticmethod
+    def param_layout(params: List[torch.Tensor]) -> tuple:
+        """参数组的布局：参数对象、形状、数据类型与设备，任一变化都需要重新分配平滑缓冲区"""
+        return tuple((id(p), tuple(p.shape), p.dtype, p.device) for p in params)
+
+    def smooth_views(self, params: List[torch.Tensor], group: int = 0) -> List[torch.Tensor]:
+        """
+        返回参数组中每个参数的历史梯度视图。按(设备, 数据类型)各分配一个扁平缓冲区，每个参数占其中连续的一段；
+        布局与上次相同时直接复用，load_state_dict载入的缓冲区在形状一致时直接采用，否则初始化为0
+        """
+        layout = self.param_layout(params)
+        state = self.smooth_states.get(group)
+        if state is not None and state["layout"] == layout:
+            return state["views"]
+
+        shapes = [tuple(p.shape) for p in params]
+        kinds = list(dict.fromkeys((p.device, p.dtype) for p in params))
+        sizes = {kind: sum(p.numel() for p in params if (p.device, p.dtype) == kind) for kind in kinds}
+        loaded = (state is not None and state["layout"] is None and state["shapes"] == shapes
+                  and [b.numel() for b in state["buffers"]] == [sizes[kind] for kind in kinds])
+        if loaded:
+            buffers = [b.to(device=device, dtype=dtype) for b, (device, dtype) in zip(state["buffers"], kinds)]
+        else:
+            buffers = [torch.zeros(sizes[kind], device=kind[0], dtype=kind[1]) for kind in kinds]
+
+        offsets = {kind: 0 for kind in kinds}
+        views = []
+        for p in params:
+            kind = (p.device, p.dtype)
+            buffer = buffers[kinds.index(kind)]
+            views.append(buffer[offsets[kind]:offsets[kind] + p.numel()].view(p.shape))
+            offsets[kind] += p.numel()
+        self.smooth_states[group] = {"layout": layout, "shapes": shapes, "buffers": buffers, "views": views}
+        return views
+
+    def state_dict(self) -> Dict:
+        """平滑状态，缓冲区以引用返回，不复制"""
+        return {"smooth_grads": {group: {"shapes": state["shapes"], "buffers": state["buffers"]}
+                                 for group, state in self.smooth_states.items()}}
+
+    def load_state_dict(self, state_dict: Dict):
+        """载入平滑状态，下次平滑时在参数形状一致的情况下直接使用载入的缓冲区"""
+        self.smooth_states = {group: {"layout": None, "shapes": [tuple(shape) for shape in state["shapes"]],
+                                      "buffers": list(state["buffers"]), "views": None}
+                              for group, state in state_dict.get("smooth_grads", {}).items()}
+
     def clip_by_norm(self, parameters, max_norm: float = 1.0, norm_type: float = 2.0):
         """按范数裁剪梯度"""
+        if self.fast:
+            before_norm = torch.nn.utils.clip_grad_norm_(parameters, max_norm, norm_type, error_if_nonfinite=False,
+                                                         foreach=True)
+            if self.collect_stats:
+                self.record_stats("clip_by_norm", total_norm=before_norm.detach())
+            return
         before_norm = torch.nn.utils.clip_grad_norm_(parameters, max_norm, norm_type, error_if_nonfinite=False)
         print(f"📏 梯度范数裁剪：裁剪前总范数={before_norm:.4f}，最大允许范数={max_norm}")
 
     def clip_by_value(self, parameters, min_val: float = -1.0, max_val: float = 1.0):
         """按值裁剪梯度"""
+        if self.fast:
+            return self.clip_by_value_foreach(self.collect_grads(parameters), min_val, max_val)
         grad_stats = []
         for p in parameters:
             if p.grad is not None:
@@ -65,6 +171,8 @@ class GradientModifier:
 
     def filter_small_grads(self, parameters, threshold: float = 1e-4):
         """过滤过小梯度（置0）"""
+        if self.fast:
+            return self.filter_small_grads_foreach(self.collect_grads(parameters), threshold)
         zero_ratio_stats = []
         for p in parameters:
             if p.grad is not None:
@@ -85,6 +193,8 @@ class GradientModifier:
 
     def scale_grads(self, parameters, scale_factor: float = 1.0):
         """缩放梯度"""
+        if self.fast:
+            return self.scale_grads_foreach(self.collect_grads(parameters), scale_factor)
         grad_mean_stats = []
         for p in parameters:
             if p.grad is not None:
@@ -101,11 +211,15 @@ class GradientModifier:
             print(f"  - {stat['param']}：梯度均值 {stat['before_mean']:.6f} → {stat['after_mean']:.6f}")
 
     def replace_undef_func_grads(self):
-        """替换不可导函数的输入张量梯度"""
-        print(f"🔄 开始替换不可导函数梯度，共{len(self.special_tensors)}个特殊张量待处理")
+        """
+        替换不可导函数的输入张量梯度
+        需要retain_grad并在反向传播后再扫描一遍张量；新代码建议直接使用gradientOpt中的直通估计器（如ste_round），
+        在backward中完成梯度替换
+        """
+        self.log(f"🔄 开始替换不可导函数梯度，共{len(self.special_tensors)}个特殊张量待处理")
         for idx, tensor in enumerate(self.special_tensors, 1):
             if tensor.grad is None:
-                print(f"  ❌ 张量{idx}：梯度为None，跳过替换")
+                self.log(f"  ❌ 张量{idx}：梯度为None，跳过替换")
                 continue
 
             # 匹配不可导函数
@@ -113,18 +227,24 @@ class GradientModifier:
             for func_name, grad_func in self.undef_func_grad_rules.items():
                 grad_fn_name = tensor._grad_fn.__class__.__name__.lower()
                 if func_name in grad_fn_name:
+                    if self.fast:
+                        tensor.grad.data = grad_func(tensor.grad.data)
+                        matched = True
+                        break
                     before_grad_mean = tensor.grad.data.mean().item()
                     tensor.grad.data = grad_func(tensor.grad.data)
                     after_grad_mean = tensor.grad.data.mean().item()
-                    print(f"  ✅ 张量{idx}：匹配函数[{func_name}]（梯度函数：{tensor._grad_fn.__class__.__name__}）")
-                    print(f"     梯度均值 {before_grad_mean:.6f} → {after_grad_mean:.6f}")
+                    self.log(f"  ✅ 张量{idx}：匹配函数[{func_name}]（梯度函数：{tensor._grad_fn.__class__.__name__}）")
+                    self.log(f"     梯度均值 {before_grad_mean:.6f} → {after_grad_mean:.6f}")
                     matched = True
                     break
             if not matched:
-                print(f"  ⚠️  张量{idx}：未匹配到任何注册的不可导函数规则")
+                self.log(f"  ⚠️  张量{idx}：未匹配到任何注册的不可导函数规则")
 
     def apply_sparsity(self, parameters, sparsity_ratio: float = 0.1):
         """梯度稀疏化（随机置0）"""
+        if self.fast:
+            return self.apply_sparsity_foreach(self.collect_grads(parameters), sparsity_ratio)
         sparsity_stats = []
         for p in parameters:
             if p.grad is not None:
@@ -142,30 +262,22 @@ class GradientModifier:
         for stat in sparsity_stats:
             print(f"  - {stat['param']}：实际稀疏占比={stat['sparsity(%)']:.2f}%，置零数量={stat['zero_count']}")
 
-    def smooth_grads(self, parameters, alpha: float = 0.9):
-        """梯度平滑（指数移动平均）"""
-        if not hasattr(self, 'prev_grads'):
-            self.prev_grads = {}
+    def smooth_grads(self, parameters, alpha: float = 0.9, group: int = 0):
+        """梯度平滑（指数移动平均），group为平滑状态所属的参数组下标"""
+        params = [p for p in parameters if p.grad is not None]
+        if self.fast:
+            return self.smooth_grads_foreach(params, alpha, group)
+        if group not in self.smooth_states:
             print(f"📝 初始化梯度历史缓存，平滑系数alpha={alpha}")
 
         smooth_stats = []
-        for p in parameters:
-            if p.grad is None:
-                continue
-
-            param_id = id(p)
+        for p, prev in zip(params, self.smooth_views(params, group)):
             before_mean = p.grad.data.mean().item()
-            # 初始化历史梯度（首次处理）
-            if param_id not in self.prev_grads:
-                self.prev_grads[param_id] = torch.zeros_like(p.grad.data)
-                print(f"  🆕 首次处理{p.__class__.__name__}，初始化历史梯度")
-
-            # 计算平滑后梯度
-            smoothed_grad = alpha * self.prev_grads[param_id] + (1 - alpha) * p.grad.data
-            after_mean = smoothed_grad.mean().item()
-            # 更新当前梯度和历史缓存
-            p.grad.data = smoothed_grad
-            self.prev_grads[param_id] = smoothed_grad.clone()
+
+            # 原地计算平滑后梯度：alpha * prev + (1 - alpha) * grad，并写回历史缓存
+            p.grad.data.lerp_(prev, alpha)
+            prev.copy_(p.grad.data)
+            after_mean = p.grad.data.mean().item()
 
             smooth_stats.append({
                 "param": p.__class__.__name__,
@@ -177,8 +289,86 @@ class GradientModifier:
         for stat in smooth_stats:
             print(f"  - {stat['param']}：梯度均值 {stat['before_mean']:.6f} → {stat['after_mean']:.6f}")
 
-    def apply(self, parameters, strategies: Optional[Dict[str, Union[Dict, bool]]] = None):
-        """一键应用多种梯度修改策略"""
+    # ------------------------------
+    # 快速模式：torch._foreach_*多张量实现，不打印、不同步
+    # ------------------------------
+    @staticmethod
+    def stack_reduce(tensors: List[torch.Tensor], reduce: Callable) -> torch.Tensor:
+        """对每个张量做归约并堆叠为一个设备张量"""
+        return torch.stack([reduce(t) for t in tensors])
+
+    def clip_by_value_foreach(self, grads: List[torch.Tensor], min_val: float = -1.0, max_val: float = 1.0):
+        """按值裁剪全部梯度"""
+        if not grads:
+            return
+        if self.collect_stats:
+            before_min, before_max = self.stack_reduce(grads, torch.amin), self.stack_reduce(grads, torch.amax)
+        torch._foreach_clamp_min_(grads, min_val)
+        torch._foreach_clamp_max_(grads, max_val)
+        if self.collect_stats:
+            self.record_stats("clip_by_value", before_min=before_min, before_max=before_max,
+                              after_min=self.stack_reduce(grads, torch.amin),
+                              after_max=self.stack_reduce(grads, torch.amax))
+
+    def filter_small_grads_foreach(self, grads: List[torch.Tensor], threshold: float = 1e-4):
+        """将绝对值小于threshold的梯度置0"""
+        if not grads:
+            return
+        if self.collect_stats:
+            zero_before = self.stack_reduce(grads, lambda g: (g == 0).sum())
+        # 与逐个参数的实现一致用masked_fill_置0，不用乘以掩码，避免inf * 0得到nan
+        for g, a in zip(grads, torch._foreach_abs(grads)):
+            g.masked_fill_(a < threshold, 0.0)
+        if self.collect_stats:
+            zero_after = self.stack_reduce(grads, lambda g: (g == 0).sum())
+            numel = torch.tensor([g.numel() for g in grads], device=zero_after.device)
+            self.record_stats("filter_small_grads", zero_count=zero_after - zero_before,
+                              zero_ratio=zero_after / numel * 100)
+
+    def scale_grads_foreach(self, grads: List[torch.Tensor], scale_factor: float = 1.0):
+        """缩放全部梯度"""
+        if not grads:
+            return
+        if self.collect_stats:
+            before_mean = self.stack_reduce(grads, torch.mean)
+        torch._foreach_mul_(grads, scale_factor)
+        if self.collect_stats:
+            self.record_stats("scale_grads", before_mean=before_mean, after_mean=self.stack_reduce(grads, torch.mean))
+
+    def apply_sparsity_foreach(self, grads: List[torch.Tensor], sparsity_ratio: float = 0.1):
+        """随机将sparsity_ratio比例的梯度置0，随机数的抽取顺序与逐个参数的实现一致"""
+        if not grads:
+            return
+        masks = [torch.rand_like(g) < sparsity_ratio for g in grads]
+        for g, mask in zip(grads, masks):
+            g.masked_fill_(mask, 0.0)
+        if self.collect_stats:
+            zero_count = self.stack_reduce(masks, lambda m: m.sum())
+            numel = torch.tensor([g.numel() for g in grads], device=zero_count.device)
+            self.record_stats("apply_sparsity", zero_count=zero_count, sparsity=zero_count / numel * 100)
+
+    def smooth_grads_foreach(self, params: List[torch.Tensor], alpha: float = 0.9, group: int = 0):
+        """
+        梯度平滑：grad = alpha * prev + (1 - alpha) * grad，即grad.lerp_(prev, alpha)，原地更新后写回历史缓存
+        """
+        if not params:
+            return
+        grads = [p.grad for p in params]
+        prevs = self.smooth_views(params, group)
+        if self.collect_stats:
+            before_mean = self.stack_reduce(grads, torch.mean)
+        torch._foreach_lerp_(grads, prevs, alpha)
+        torch._foreach_copy_(prevs, grads)
+        if self.collect_stats:
+            self.record_stats("smooth_grads", before_mean=before_mean, after_mean=self.stack_reduce(grads, torch.mean))
+
+    def param_groups(self, parameters, strategies: Optional[Dict[str, Union[Dict, bool]]] = None) -> List[tuple]:
+        """
+        将参数一次性整理为参数组，parameters可以是参数的生成器/列表，也可以是字典列表
+        [{"params": 参数, "strategies": 该组的策略配置}, ...]（如optimizer.param_groups），
+        每组的策略依次由默认策略、strategies、组内strategies覆盖，未知策略打印提示后跳过
+        :return: [(参数列表, 策略配置), ...]
+        """
         # 默认策略配置
         default_strategies = {
             "clip_by_norm": {"max_norm": 1.0, "norm_type": 2.0},
@@ -188,36 +378,148 @@ class GradientModifier:
         # 合并策略（用户策略覆盖默认）
         final_strategies = {**default_strategies, **(strategies or {})}
 
-        print("=" * 60)
-        print("🚀 开始执行梯度修改策略，共启用{}种策略".format(sum(1 for v in final_strategies.values() if v)))
-        print("=" * 60)
-
-        for strategy, config in final_strategies.items():
-            if not config:
-                print(f"\n❌ 跳过策略：{strategy}（已禁用）")
+        parameters = list(parameters)
+        if parameters and isinstance(parameters[0], dict):
+            groups = [(list(group["params"]), {**final_strategies, **group.get("strategies", {})})
+                      for group in parameters]
+        else:
+            groups = [(parameters, final_strategies)]
+
+        unknown = list(dict.fromkeys(name for _, group_strategies in groups for name in group_strategies
+                                     if name not in self.STRATEGIES))
+        for name in unknown:
+            print(f"❌ 未知策略：{name}，跳过执行")
+        return [(params, {name: config for name, config in group_strategies.items() if name in self.STRATEGIES})
+                for params, group_strategies in groups]
+
+    def build_pipeline(self, strategies: Dict[str, Union[Dict, bool]]) -> Callable:
+        """
+        将策略链预编译为逐张量函数 pipeline(grad, prev)，grad原地修改，prev为平滑的历史梯度（不平滑时为None），
+        经torch.compile融合后每个张量只读写一遍
+        """
+        # 流水线按策略的先后顺序执行，缓存键保留顺序
+        key = repr([(name, config) for name, config in strategies.items()
+                    if name in self.FUSED_STRATEGIES and config])
+        if key in self.pipelines:
+            return self.pipelines[key]
+
+        ops = []
+        for name, config in strategies.items():
+            if not config or name not in self.FUSED_STRATEGIES:
                 continue
+            config = {} if isinstance(config, bool) else config
+            if name == "clip_by_value":
+                lo, hi = config.get("min_val", -1.0), config.get("max_val", 1.0)
+                ops.append(lambda g, prev, lo=lo, hi=hi: g.clamp_(lo, hi))
+            elif name == "filter_small_grads":
+                threshold = config.get("threshold", 1e-4)
+                ops.append(lambda g, prev, t=threshold: g.masked_fill_(g.abs() < t, 0.0))
+            elif name == "scale_grads":
+                scale = config.get("scale_factor", 1.0)
+                ops.append(lambda g, prev, s=scale: g.mul_(s))
+            elif name == "apply_sparsity":
+                ratio = config.get("sparsity_ratio", 0.1)
+                ops.append(lambda g, prev, r=ratio: g.masked_fill_(torch.rand_like(g) < r, 0.0))
+            elif name == "smooth_grads":
+                alpha = config.get("alpha", 0.9)
+                ops.append(lambda g, prev, a=alpha: prev.copy_(g.lerp_(prev, a)))
+
+        def pipeline(grad, prev):
+            for op in ops:
+                op(grad, prev)
+
+        pipeline = torch.compile(pipeline, dynamic=True)
+        self.pipelines[key] = pipeline
+        return pipeline
+
+    def apply_fused(self, params: List[torch.Tensor], strategies: Dict[str, Union[Dict, bool]], group: int = 0):
+        """
+        对一个参数组执行快速模式的策略链：clip_by_norm由clip_grad_norm_(foreach=True)完成（支持梯度分布在多个设备上），
+        其余策略在compile=True且不收集统计时逐张量执行一次编译后的流水线，否则按顺序调用*_foreach方法
+        """
+        params = [p for p in params if p.grad is not None]
+        if not params:
+            return
+
+        clip = strategies.get("clip_by_norm")
+        if clip:
+            self.clip_by_norm(params, **({} if isinstance(clip, bool) else clip))
+
+        if not self.compile or self.collect_stats:
+            grads = [p.grad for p in params]
+            for name, config in strategies.items():
+                if not config or name not in self.FUSED_STRATEGIES:
+                    continue
+                config = {} if isinstance(config, bool) else config
+                if name == "smooth_grads":
+                    self.smooth_grads_foreach(params, group=group, **config)
+                else:
+                    getattr(self, name + "_foreach")(grads, **config)
+            return
+
+        prevs = self.smooth_views(params, group) if strategies.get("smooth_grads") else [None] * len(params)
+        pipeline = self.build_pipeline(strategies)
+        for p, prev in zip(params, prevs):
+            pipeline(p.grad, prev)
 
-            # 处理配置格式
-            if isinstance(config, bool):
-                config = {}
-            print(f"\n📌 正在执行策略：{strategy}，配置={config}")
-
-            # 调用对应策略方法
-            if hasattr(self, strategy):
+    def apply(self, parameters, strategies: Optional[Dict[str, Union[Dict, bool]]] = None):
+        """
+        一键应用多种梯度修改策略
+        :param parameters: 参数的生成器/列表（如model.parameters()），或者参数组字典列表
+                           [{"params": 参数, "strategies": 该组的策略配置}, ...]
+        :param strategies: 所有参数组共用的策略配置，覆盖默认策略
+        快速模式下按apply_fused执行（不打印、不同步）；否则逐个策略执行并打印过程
+        """
+        groups = self.param_groups(parameters, strategies)
+
+        if self.fast:
+            for group_idx, (params, group_strategies) in enumerate(groups):
+                self.apply_fused(params, group_strategies, group_idx)
+            if any(group_strategies.get("replace_undef_func_grads") for _, group_strategies in groups):
+                self.replace_undef_func_grads()
+            return
+
+        for group_idx, (params, final_strategies) in enumerate(groups):
+            if len(groups) > 1:
+                self.log(f"\n📂 参数组{group_idx + 1}/{len(groups)}：共{len(params)}个参数")
+            self.log("=" * 60)
+            self.log("🚀 开始执行梯度修改策略，共启用{}种策略".format(sum(1 for v in final_strategies.values() if v)))
+            self.log("=" * 60)
+
+            for strategy, config in final_strategies.items():
+                if not config:
+                    self.log(f"\n❌ 跳过策略：{strategy}（已禁用）")
+                    continue
+
+                # 不可导函数梯度替换与参数无关，所有参数组处理完后只执行一次
+                if strategy == "replace_undef_func_grads":
+                    continue
+
+                # 处理配置格式
+                if isinstance(config, bool):
+                    config = {}
+                self.log(f"\n📌 正在执行策略：{strategy}，配置={config}")
+
+                # 调用对应策略方法，未知策略已在param_groups中跳过
                 try:
-                    if strategy == "replace_undef_func_grads":
-                        getattr(self, strategy)()  # 无parameters参数
-                    else:
-                        getattr(self, strategy)(parameters, **config)
-                    print(f"✅ 策略{strategy}执行完成")
+                    if strategy == "smooth_grads":
+                        config = {**config, "group": group_idx}
+                    getattr(self, strategy)(params, **config)
+                    self.log(f"✅ 策略{strategy}执行完成")
                 except Exception as e:
                     print(f"❌ 策略{strategy}执行失败：{str(e)}")
-            else:
-                print(f"❌ 未知策略：{strategy}，跳过执行")
 
-        print("\n" + "=" * 60)
-        print("🎉 所有梯度修改策略执行完毕")
-        print("=" * 60)
+        if any(group_strategies.get("replace_undef_func_grads") for _, group_strategies in groups):
+            self.log(f"\n📌 正在执行策略：replace_undef_func_grads")
+            try:
+                self.replace_undef_func_grads()
+                self.log(f"✅ 策略replace_undef_func_grads执行完成")
+            except Exception as e:
+                print(f"❌ 策略replace_undef_func_grads执行失败：{str(e)}")
+
+        self.log("\n" + "=" * 60)
+        self.log("🎉 所有梯度修改策略执行完毕")
+        self.log("=" * 60)
 
 
 # ------------------------------
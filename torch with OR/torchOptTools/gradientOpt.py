@@ -4,3 +4,288 @@
 # @Author  : xueyudian
 # @File    : gradientOpt.py
 # @Project : OR
+
+"""
+直通估计器（Straight-Through Estimator）自定义梯度函数库
+前向计算保持round、floor、ceil、sign、clamp、argmax独热、top-k掩码等不可导（或梯度处处为0）的离散操作，
+反向传播时直接在backward中用代理梯度代替真实梯度，不需要retain_grad，也不需要在反向传播后再扫描张量、覆盖.grad
+代理梯度（surrogate）：
+    'identity'：梯度原样传回（经典直通估计器）
+    'sigmoid'：sigmoid导数，在离散操作的跳变点附近最大，beta越大越集中；beta=4时跳变点处的梯度为1，与'identity'一致；
+               argmax独热与top-k掩码的'sigmoid'分别为softmax的导数与以第k、k+1大的值的中点为阈值的sigmoid导数
+    自定义函数：surrogate(grad_output, x)，返回输入x的梯度
+只有使用'sigmoid'或自定义函数时才在反向传播中保存输入张量
+"""
+
+import torch
+from typing import Callable, Optional, Union
+
+Surrogate = Union[str, Callable]
+
+
+def check_surrogate(surrogate: Surrogate):
+    if not callable(surrogate) and surrogate not in ("identity", "sigmoid"):
+        raise ValueError(f"请输入正确的surrogate：可选'identity'、'sigmoid'或自定义函数")
+
+
+def save_input(ctx, x: torch.Tensor, surrogate: Surrogate, beta: float):
+    """保存反向传播所需的信息，'identity'不保存输入张量"""
+    ctx.surrogate = surrogate
+    ctx.beta = beta
+    if surrogate != "identity":
+        ctx.save_for_backward(x)
+
+
+def sigmoid_derivative(u: torch.Tensor, beta: float) -> torch.Tensor:
+    """sigmoid(beta * u)对u的导数 beta * s * (1 - s)，其中s = sigmoid(beta * u)，u=0处为beta / 4"""
+    s = torch.sigmoid(beta * u)
+    return beta * s * (1 - s)
+
+
+def step_backward(ctx, grad_output: torch.Tensor, distance: Callable, jump: float = 1.0) -> torch.Tensor:
+    """
+    阶梯函数的代理梯度
+    :param distance: 输入到最近跳变点的有符号距离
+    :param jump: 每个跳变点处函数值的变化量
+    """
+    if ctx.surrogate == "identity":
+        return grad_output
+    x, = ctx.saved_tensors
+    if callable(ctx.surrogate):
+        return ctx.surrogate(grad_output, x)
+    return grad_output * jump * sigmoid_derivative(distance(x), ctx.beta)
+
+
+class RoundSTE(torch.autograd.Function):
+    """四舍五入，跳变点为k + 0.5"""
+
+    @staticmethod
+    def forward(ctx, x, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        return torch.round(x)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        return step_backward(ctx, grad_output, lambda x: x - torch.floor(x) - 0.5), None, None
+
+
+class FloorSTE(torch.autograd.Function):
+    """向下取整，跳变点为整数"""
+
+    @staticmethod
+    def forward(ctx, x, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        return torch.floor(x)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        return step_backward(ctx, grad_output, lambda x: x - torch.round(x)), None, None
+
+
+class CeilSTE(torch.autograd.Function):
+    """向上取整，跳变点为整数"""
+
+    @staticmethod
+    def forward(ctx, x, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        return torch.ceil(x)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        return step_backward(ctx, grad_output, lambda x: x - torch.round(x)), None, None
+
+
+class SignSTE(torch.autograd.Function):
+    """符号函数，跳变点为0，函数值从-1变为1"""
+
+    @staticmethod
+    def forward(ctx, x, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        return torch.sign(x)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        return step_backward(ctx, grad_output, lambda x: x, jump=2.0), None, None
+
+
+class ClampSTE(torch.autograd.Function):
+    """
+    截断，区间外的真实梯度为0；'identity'让梯度在区间外也能传回，'sigmoid'在区间边界附近平滑衰减
+    """
+
+    @staticmethod
+    def forward(ctx, x, min_val=None, max_val=None, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        ctx.min_val, ctx.max_val = min_val, max_val
+        return torch.clamp(x, min_val, max_val)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        if ctx.surrogate == "identity":
+            return grad_output, None, None, None, None
+        x, = ctx.saved_tensors
+        if callable(ctx.surrogate):
+            return ctx.surrogate(grad_output, x), None, None, None, None
+        gate = torch.ones_like(x)
+        if ctx.min_val is not None:
+            gate = gate * torch.sigmoid(ctx.beta * (x - ctx.min_val))
+        if ctx.max_val is not None:
+            gate = gate * torch.sigmoid(ctx.beta * (ctx.max_val - x))
+        return grad_output * gate, None, None, None, None
+
+
+class ArgmaxOneHotSTE(torch.autograd.Function):
+    """
+    argmax独热编码，'sigmoid'使用softmax(beta * x)的导数（sigmoid在多分类下的推广）
+    """
+
+    @staticmethod
+    def forward(ctx, x, dim=-1, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        ctx.dim = dim
+        return torch.zeros_like(x).scatter_(dim, x.argmax(dim, keepdim=True), 1.0)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        if ctx.surrogate == "identity":
+            return grad_output, None, None, None
+        x, = ctx.saved_tensors
+        if callable(ctx.surrogate):
+            return ctx.surrogate(grad_output, x), None, None, None
+        y = torch.softmax(ctx.beta * x, ctx.dim)
+        grad = ctx.beta * y * (grad_output - (grad_output * y).sum(ctx.dim, keepdim=True))
+        return grad, None, None, None
+
+
+class TopKSTE(torch.autograd.Function):
+    """
+    top-k掩码：每个切片中最大的k个元素为1，其余为0；
+    'sigmoid'以第k大与第k+1大的值的中点为阈值，使用sigmoid(beta * (x - 阈值))的导数
+    """
+
+    @staticmethod
+    def forward(ctx, x, k, dim=-1, surrogate="identity", beta=4.0):
+        save_input(ctx, x, surrogate, beta)
+        ctx.k, ctx.dim = k, dim
+        return torch.zeros_like(x).scatter_(dim, x.topk(k, dim).indices, 1.0)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        if ctx.surrogate == "identity":
+            return grad_output, None, None, None, None
+        x, = ctx.saved_tensors
+        if callable(ctx.surrogate):
+            return ctx.surrogate(grad_output, x), None, None, None, None
+        if ctx.k >= x.size(ctx.dim):
+            # 全部元素都被选中，没有跳变点
+            return torch.zeros_like(grad_output), None, None, None, None
+        values = x.topk(ctx.k + 1, ctx.dim).values
+        threshold = (values.narrow(ctx.dim, ctx.k - 1, 1) + values.narrow(ctx.dim, ctx.k, 1)) / 2
+        return grad_output * sigmoid_derivative(x - threshold, ctx.beta), None, None, None, None
+
+
+def ste_round(x: torch.Tensor, surrogate: Surrogate = "identity", beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return RoundSTE.apply(x, surrogate, beta)
+
+
+def ste_floor(x: torch.Tensor, surrogate: Surrogate = "identity", beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return FloorSTE.apply(x, surrogate, beta)
+
+
+def ste_ceil(x: torch.Tensor, surrogate: Surrogate = "identity", beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return CeilSTE.apply(x, surrogate, beta)
+
+
+def ste_sign(x: torch.Tensor, surrogate: Surrogate = "identity", beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return SignSTE.apply(x, surrogate, beta)
+
+
+def ste_clamp(x: torch.Tensor, min_val: Optional[float] = None, max_val: Optional[float] = None,
+              surrogate: Surrogate = "identity", beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return ClampSTE.apply(x, min_val, max_val, surrogate, beta)
+
+
+def ste_argmax_onehot(x: torch.Tensor, dim: int = -1, surrogate: Surrogate = "identity",
+                      beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    return ArgmaxOneHotSTE.apply(x, dim, surrogate, beta)
+
+
+def ste_topk(x: torch.Tensor, k: int, dim: int = -1, surrogate: Surrogate = "identity",
+             beta: float = 4.0) -> torch.Tensor:
+    check_surrogate(surrogate)
+    if not isinstance(k, int) or not 1 <= k <= x.size(dim):
+        raise ValueError(f"请输入正确的k")
+    return TopKSTE.apply(x, k, dim, surrogate, beta)
+
+
+# 函数名到直通估计器的映射，可按名称选择
+STE_FUNCTIONS = {
+    "round": ste_round,
+    "floor": ste_floor,
+    "ceil": ste_ceil,
+    "sign": ste_sign,
+    "clamp": ste_clamp,
+    "argmax_onehot": ste_argmax_onehot,
+    "topk": ste_topk
+}
+
+
+# ------------------------------
+# 测试案例：整数决策的可微松弛
+# ------------------------------
+if __name__ == "__main__":
+    torch.manual_seed(42)
+
+    # 1. 各函数的前向结果与代理梯度
+    x = torch.tensor([-1.3, -0.4, 0.2, 0.5, 1.7, 2.49], requires_grad=True)
+    for name in ["round", "floor", "ceil", "sign"]:
+        for surrogate in ["identity", "sigmoid"]:
+            x.grad = None
+            y = STE_FUNCTIONS[name](x, surrogate=surrogate)
+            y.sum().backward()
+            print(f"{name:<6}（{surrogate:<8}）：前向={y.tolist()}，梯度={[round(v, 4) for v in x.grad.tolist()]}")
+
+    x.grad = None
+    ste_clamp(x, 0.0, 1.0, surrogate="sigmoid").sum().backward()
+    print(f"clamp （sigmoid ）：梯度={[round(v, 4) for v in x.grad.tolist()]}")
+
+    x.grad = None
+    ste_round(x, surrogate=lambda grad, inp: grad * 0.5).sum().backward()
+    print(f"round （自定义  ）：梯度={x.grad.tolist()}")
+
+    # 2. 整数决策：学习每种物品的装入数量（取整），使总价值最大且总重量不超过容量，约束用罚函数处理
+    values = torch.tensor([6.0, 5.0, 8.0, 9.0, 6.0])
+    weights = torch.tensor([4.0, 2.0, 6.0, 7.0, 5.0])
+    max_num = torch.tensor([3.0, 7.0, 7.0, 7.0, 4.0])
+    max_weight = 40.0
+    logits = torch.zeros(5, requires_grad=True)
+    optimizer = torch.optim.Adam([logits], lr=0.1)
+    for step in range(300):
+        quantities = ste_round(torch.sigmoid(logits) * max_num, surrogate="sigmoid")
+        weight = (quantities * weights).sum()
+        loss = -(quantities * values).sum() + 20 * torch.relu(weight - max_weight)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    quantities = torch.round(torch.sigmoid(logits) * max_num).detach()
+    print(f"整数决策：数量={quantities.tolist()}，总价值={(quantities * values).sum().item()}，"
+          f"总重量={(quantities * weights).sum().item()}（容量{max_weight}）")
+
+    # 3. 离散选择：从4个选项中选出1个（argmax独热）与2个（top-k），使选中项的得分之和最大
+    scores = torch.tensor([[1.0, 3.0, 2.0, 0.5]])
+    for name, fn in [("argmax_onehot", lambda z: ste_argmax_onehot(z, surrogate="sigmoid")),
+                     ("topk", lambda z: ste_topk(z, 2, surrogate="sigmoid"))]:
+        z = torch.zeros(1, 4, requires_grad=True)
+        optimizer = torch.optim.SGD([z], lr=0.5)
+        for step in range(50):
+            loss = -(fn(z + 0.01 * torch.randn_like(z)) * scores).sum()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        print(f"{name}：选择结果={fn(z).tolist()}")